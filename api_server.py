@@ -0,0 +1,417 @@
+import argparse
+import asyncio
+import collections
+import datetime
+import json
+import os
+import re
+import signal
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from command_parser import parse_command
+from metrics import METRICS
+from model_registry import ModelRegistry
+from mood_scorer import LexiconScorer, MoodCascade
+from schedule_engine import ScheduleEngine
+from schedule_index import format_slot
+from sentiment_service import SentimentService
+from storage import Store
+
+# Local HTTP/JSON API serving many users from one process:
+#
+#   python api_server.py --port 8765 --data-dir users
+#   curl localhost:8765/users/alice/schedule
+#   curl -d '{"text": "add target Finish report by 2025-12-31"}' localhost:8765/users/alice/commands
+#
+# Endpoints (bodies and responses are JSON):
+#   GET  /health                      liveness
+#   GET  /stats                       users, sentiment batching, mood tiers and timing metrics
+#   GET  /users/<user>/schedule       ?date=YYYY-MM-DD&fresh=1; generates and saves the day
+#   POST /users/<user>/commands       {"text"} natural-language command, as in the GUI
+#   POST /users/<user>/mood           {"text"} scores the mood and updates the stress level
+#   GET  /users/<user>/goals          {kind: {name: deadline}}
+#   POST /users/<user>/goals          {"kind", "name", "deadline"}
+#   POST /users/<user>/outcomes       {"task", "completed"} like Mark Done / Mark Skipped
+#
+# Each user has their own engine and database file under the data directory; users
+# not seen for a while are closed once more than --max-users are open. The sentiment
+# model is loaded once and shared; mood texts from concurrent requests are scored
+# together in micro-batches. Connections are kept alive between requests (HTTP/1.1).
+
+USER_RE = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+MAX_BODY = 1 << 20
+MAX_HEADERS = 100
+KEEP_ALIVE_SECONDS = 15  # Idle time before a kept-alive connection is closed
+
+REASONS = {
+    200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    408: "Request Timeout", 411: "Length Required", 413: "Payload Too Large", 500: "Internal Server Error",
+    501: "Not Implemented",
+}
+
+STRESS_LEVELS = {"NEGATIVE": "high", "POSITIVE": "low"}  # Mood label -> stress level; anything else is "normal"
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class UserState:
+    def __init__(self, name, store, engine):
+        self.name = name
+        self.store = store
+        self.engine = engine
+        self.lock = asyncio.Lock()  # Engine calls for one user never interleave
+        self.active = 0  # Requests in progress; the user is only closed when none are
+
+
+def open_user(path):
+    # Same saved state the GUI and CLI start from, minus the desktop-only pickle import
+    store = Store(path)
+    engine = ScheduleEngine()
+    engine.user_preferences.update(store.load_preferences())
+    engine.load_state(store)
+    return store, engine
+
+
+def _slot_json(slot):
+    return {"start": slot.start, "end": slot.end, "time": format_slot(slot.start, slot.end), "task": slot.task}
+
+
+def _date(value, field="date"):
+    try:
+        return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ApiError(400, f"'{field}' must be a date in YYYY-MM-DD format")
+
+
+def _text(body, field="text"):
+    value = body.get(field)
+    if not isinstance(value, str) or not value.strip():
+        raise ApiError(400, f"'{field}' is required")
+    return value.strip()
+
+
+class ApiServer:
+    def __init__(self, data_dir="users", max_users=256, workers=4, batch_size=16, lexicon_only=False, models=None):
+        self.data_dir = data_dir
+        self.max_users = max_users
+        self.users = collections.OrderedDict()  # Name -> UserState, least recently used first
+        self._opening = {}  # Name -> task opening that user's state
+        self._waiting = {}  # Name -> requests waiting for that task, handed to the state as active references
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api-engine")
+        tiers = [("lexicon", LexiconScorer())]
+        self.sentiment = None
+        if not lexicon_only:
+            # One registry and one batching service for every user; model waits run on their own threads so
+            # enough texts are in flight at once to fill a batch
+            self.models = models or ModelRegistry(shared_dir=os.environ.get("DAILY_LIFE_MODEL_DIR"))
+            if "sentiment" not in self.models.names():
+                self.models.register_pipeline("sentiment", "sentiment-analysis")
+            self.sentiment = SentimentService(lambda: self.models.get("sentiment"), max_batch_size=batch_size)
+            tiers.append(("model", self.sentiment.score))
+        self.model_pool = ThreadPoolExecutor(max_workers=batch_size * 2, thread_name_prefix="api-model")
+        self.mood_scorer = MoodCascade(tiers)
+        self.routes = {
+            ("GET", "schedule"): self.get_schedule,
+            ("POST", "commands"): self.post_command,
+            ("POST", "mood"): self.post_mood,
+            ("GET", "goals"): self.get_goals,
+            ("POST", "goals"): self.post_goal,
+            ("POST", "outcomes"): self.post_outcome,
+        }
+
+    # Users
+
+    async def user(self, name):
+        # The user's state, already counted as active so it cannot be evicted; the caller decrements state.active
+        if not USER_RE.match(name):
+            raise ApiError(400, "User names may only contain letters, digits, '.', '_' and '-'")
+        state = self.users.get(name)
+        if state is not None:
+            self.users.move_to_end(name)
+            state.active += 1
+            return state
+        opening = self._opening.get(name)
+        if opening is None:
+            self._waiting[name] = 0
+            opening = self._opening[name] = asyncio.ensure_future(self._open_user(name))
+        self._waiting[name] = self._waiting.get(name, 0) + 1
+        try:
+            return await asyncio.shield(opening)
+        except asyncio.CancelledError:
+            # Give back the reference this request was going to receive
+            if not opening.done():
+                self._waiting[name] -= 1
+            elif not opening.cancelled() and opening.exception() is None:
+                opening.result().active -= 1
+            raise
+        finally:
+            self._opening.pop(name, None)
+
+    async def _open_user(self, name):
+        path = os.path.join(self.data_dir, f"{name}.db")
+        try:
+            store, engine = await asyncio.get_running_loop().run_in_executor(self.pool, open_user, path)
+        except BaseException:
+            self._waiting.pop(name, None)
+            raise
+        state = self.users[name] = UserState(name, store, engine)
+        # Taken before the next await, so no other request's eviction sees the new user idle
+        state.active = self._waiting.pop(name, 0)
+        await self._evict()
+        return state
+
+    async def _evict(self):
+        # Close the least recently used users that are not in the middle of a request
+        for name in list(self.users):
+            if len(self.users) <= self.max_users:
+                return
+            state = self.users.get(name)
+            if state is not None and not state.active:
+                del self.users[name]
+                await asyncio.get_running_loop().run_in_executor(self.pool, state.store.close)
+
+    async def run_locked(self, state, fn, *args):
+        async with state.lock:
+            return await asyncio.get_running_loop().run_in_executor(self.pool, fn, state, *args)
+
+    # Handlers; each returns (status, JSON-serializable payload)
+
+    async def get_schedule(self, state, query, body):
+        day = _date(query["date"][0]) if "date" in query else datetime.date.today()
+        fresh = query.get("fresh", ["0"])[0] not in ("", "0", "false")
+
+        def generate(state):
+            schedule = state.engine.generate_daily_schedule(day, fresh=fresh)
+            state.store.save_schedule(day, schedule)
+            state.store.archive_goals(state.engine.take_archived())
+            return [_slot_json(slot) for slot in schedule]
+        return 200, {"day": day.isoformat(), "slots": await self.run_locked(state, generate)}
+
+    async def post_command(self, state, query, body):
+        command = parse_command(_text(body))
+        if command.action is not None:
+            def apply(state):
+                applied = state.engine.apply_command(command)
+                if applied.action == "task":
+                    state.store.add_task(applied.name)
+                else:
+                    state.store.save_goal(applied.action, applied.name, applied.deadline)
+                return applied
+            command = await self.run_locked(state, apply)
+        return 200, {"action": command.action, "name": command.name, "deadline": command.deadline,
+                     "feedback": command.feedback}
+
+    async def post_mood(self, state, query, body):
+        text = _text(body)
+        threshold = state.engine.user_preferences.get("mood_confidence_threshold", self.mood_scorer.threshold)
+        # Scored outside the user's lock; waiting on the model does not hold up their other requests
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self.model_pool, self.mood_scorer.score, text, threshold)
+        stress_level = STRESS_LEVELS.get(result["label"], "normal")
+
+        def save(state):
+            state.engine.user_preferences["stress_level"] = stress_level
+            state.store.set_preferences({"stress_level": stress_level})
+        await self.run_locked(state, save)
+        return 200, {"stress_level": stress_level, "label": result["label"], "score": result["score"],
+                     "tier": result["tier"]}
+
+    async def get_goals(self, state, query, body):
+        def read(state):
+            engine = state.engine
+            return {
+                "target": dict(engine.targets), "yearly": dict(engine.yearly_tasks), "complex": dict(engine.complex_tasks),
+            }
+        return 200, await self.run_locked(state, read)
+
+    async def post_goal(self, state, query, body):
+        kind = body.get("kind")
+        adders = {"target": "add_target", "yearly": "add_yearly_task", "complex": "add_complex_task"}
+        if kind not in adders:
+            raise ApiError(400, f"'kind' must be one of {', '.join(adders)}")
+        name = _text(body, "name")
+        deadline = _date(body.get("deadline"), "deadline").isoformat()
+
+        def add(state):
+            getattr(state.engine, adders[kind])(name, deadline)
+            state.store.save_goal(kind, name, deadline)
+        await self.run_locked(state, add)
+        return 201, {"kind": kind, "name": name, "deadline": deadline}
+
+    async def post_outcome(self, state, query, body):
+        label = _text(body, "task")
+        completed = body.get("completed", True)
+        if not isinstance(completed, bool):
+            raise ApiError(400, "'completed' must be true or false")
+
+        def record(state):
+            task = state.engine.record_outcome(label, completed)
+            state.store.record_task(task, "completed" if completed else "skipped")
+            state.store.set_meta("behavior_stats", state.engine.stats.to_dict())
+            state.store.set_meta("completed_subtasks", state.engine.completed_subtasks())
+            state.store.archive_goals(state.engine.take_archived())
+            return task
+        return 200, {"task": await self.run_locked(state, record), "completed": completed}
+
+    def stats(self):
+        return {
+            "users": len(self.users),
+            "sentiment": self.sentiment.stats() if self.sentiment else None,
+            "mood": self.mood_scorer.stats(),
+            "metrics": METRICS.snapshot(),
+        }
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        parts = [part for part in url.path.split("/") if part]
+        if parts == ["health"]:
+            return 200, {"status": "ok"}
+        if parts == ["stats"]:
+            return 200, self.stats()
+        if len(parts) != 3 or parts[0] != "users":
+            raise ApiError(404, f"No endpoint at {url.path}")
+        handler = self.routes.get((method, parts[2]))
+        if handler is None:
+            if any(resource == parts[2] for verb, resource in self.routes):
+                raise ApiError(405, f"{method} is not allowed on {parts[2]}")
+            raise ApiError(404, f"No endpoint at {url.path}")
+        if body:
+            try:
+                body = json.loads(body)
+            except (UnicodeDecodeError, ValueError):
+                raise ApiError(400, "Request body must be JSON")
+            if not isinstance(body, dict):
+                raise ApiError(400, "Request body must be a JSON object")
+        else:
+            body = {}
+        state = await self.user(parts[1])
+        try:
+            with METRICS.timer(f"api_{parts[2]}"):
+                return await handler(state, parse_qs(url.query), body)
+        finally:
+            state.active -= 1
+
+    # HTTP
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line.strip():
+                    break
+                keep_alive = framed = False
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                    headers = await self._read_headers(reader)
+                    connection = headers.get("connection", "").lower()
+                    keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+                    body = await self._read_body(reader, headers)
+                    framed = True
+                    status, payload = await self.dispatch(method.upper(), target, body)
+                except ApiError as e:
+                    status, payload = e.status, {"error": str(e)}
+                    keep_alive = keep_alive and framed  # Without a complete request the stream cannot be reused
+                except ValueError:
+                    status, payload, keep_alive = 400, {"error": "Malformed request"}, False
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    break
+                except Exception as e:
+                    print(f"Error handling {request_line!r}: {e}")
+                    status, payload = 500, {"error": "Internal server error"}
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass  # Cancelled when the server shuts down with the connection still open
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_headers(self, reader):
+        headers = {}
+        for _ in range(MAX_HEADERS + 1):
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                return headers
+            name, separator, value = line.decode("latin-1").partition(":")
+            if not separator:
+                raise ValueError("Malformed header")
+            headers[name.strip().lower()] = value.strip()
+        raise ApiError(400, "Too many headers")
+
+    async def _read_body(self, reader, headers):
+        if "transfer-encoding" in headers:
+            raise ApiError(501, "Chunked request bodies are not supported; send Content-Length")
+        length = int(headers.get("content-length", 0))
+        if length > MAX_BODY:
+            raise ApiError(413, f"Request bodies are limited to {MAX_BODY} bytes")
+        return await reader.readexactly(length) if length > 0 else b""
+
+    def _write_response(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body
+        )
+
+    async def serve(self, host="127.0.0.1", port=8765, ready=None):
+        os.makedirs(self.data_dir, exist_ok=True)
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        if ready is not None:
+            ready(server)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        for state in self.users.values():
+            state.store.close()
+        self.users.clear()
+        if self.sentiment is not None:
+            self.sentiment.close(timeout=1)
+        self.pool.shutdown()
+        self.model_pool.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the planner to several users over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--data-dir", default="users", help="one database per user is kept here (default: %(default)s)")
+    parser.add_argument("--max-users", type=int, default=256, help="users kept open at once (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=4, help="threads running engine work (default: %(default)s)")
+    parser.add_argument("--batch-size", type=int, default=16, help="largest sentiment batch (default: %(default)s)")
+    parser.add_argument("--lexicon-only", action="store_true", help="score moods with the word list only; never loads the model")
+    args = parser.parse_args(argv)
+
+    server = ApiServer(args.data_dir, args.max_users, args.workers, args.batch_size, args.lexicon_only)
+
+    def ready(listener):
+        addresses = ", ".join(f"{sock.getsockname()[0]}:{sock.getsockname()[1]}" for sock in listener.sockets)
+        print(f"Serving on {addresses}", flush=True)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)  # Stop the same way as Ctrl+C, so stores flush
+    try:
+        asyncio.run(server.serve(args.host, args.port, ready))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+import collections
+import queue
+import threading
+import time
+import traceback
+
+# Work runs on named lanes, one thread each, in submission order. Results come back
+# through a queue that the UI thread drains (from root.after), so callbacks never run
+# on a worker. Jobs submitted with a key replace the previous job with that key: a
+# queued one is skipped and a running one has its result dropped.
+
+
+class Job:
+    def __init__(self, fn, args, key, lane, on_done, on_error):
+        self.fn = fn
+        self.args = args
+        self.key = key
+        self.lane = lane
+        self.on_done = on_done
+        self.on_error = on_error
+        self.cancelled = False  # Long jobs may poll this and stop early
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class BackgroundExecutor:
+    def __init__(self, on_error=None):
+        self.on_error = on_error  # Used for jobs submitted without their own error callback
+        self._lock = threading.Condition()
+        self._lanes = {}  # Lane name -> deque of queued jobs
+        self._threads = {}
+        self._latest = {}  # Key -> newest job with that key
+        self._results = queue.SimpleQueue()
+        self._pending = 0  # Jobs whose result has not been delivered or dropped yet
+        self._closed = False
+
+    def submit(self, fn, *args, key=None, lane="default", on_done=None, on_error=None):
+        job = Job(fn, args, key, lane, on_done, on_error)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Background executor is shut down")
+            if key is not None:
+                previous = self._latest.get(key)
+                if previous is not None:
+                    previous.cancel()
+                self._latest[key] = job
+            self._lanes.setdefault(lane, collections.deque()).append(job)
+            self._pending += 1
+            if lane not in self._threads:
+                thread = threading.Thread(target=self._run, args=(lane,), name=f"background-{lane}", daemon=True)
+                self._threads[lane] = thread
+                thread.start()
+            self._lock.notify_all()
+        return job
+
+    def _run(self, lane):
+        jobs = self._lanes[lane]
+        while True:
+            with self._lock:
+                while not jobs and not self._closed:
+                    self._lock.wait()
+                if not jobs:
+                    return
+                job = jobs.popleft()
+                if job.cancelled:
+                    self._finish(job)
+                    continue
+            try:
+                callback, value = job.on_done, job.fn(*job.args)
+            except Exception as exc:
+                callback, value = job.on_error or self.on_error, exc
+                if callback is None:
+                    traceback.print_exception(type(exc), exc, exc.__traceback__)
+            with self._lock:
+                if job.cancelled or callback is None:
+                    self._finish(job)
+                else:
+                    self._results.put((job, callback, value))
+                    self._lock.notify_all()
+
+    def _finish(self, job):
+        # Called with the lock held
+        if job.key is not None and self._latest.get(job.key) is job:
+            del self._latest[job.key]
+        self._pending -= 1
+        self._lock.notify_all()
+
+    def pending(self):
+        return self._pending
+
+    def drain(self, limit=None):
+        # Run delivered callbacks on the calling thread; returns how many were handled
+        handled = 0
+        while limit is None or handled < limit:
+            try:
+                job, callback, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                if not job.cancelled:
+                    callback(value)
+            except Exception:
+                traceback.print_exc()
+            finally:
+                with self._lock:
+                    self._finish(job)
+            handled += 1
+        return handled
+
+    def wait(self, timeout=None):
+        # Drain on the calling thread until nothing is pending, for scripts and benchmarks; False on timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            self.drain()
+            with self._lock:
+                if not self._pending:
+                    return True
+                if not self._results.empty():
+                    continue
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._lock.wait(remaining)
+
+    def shutdown(self, timeout=None):
+        # Queued jobs still run (they may be saving data); undelivered results are dropped
+        with self._lock:
+            self._closed = True
+            self._lock.notify_all()
+            threads = list(self._threads.values())
+        for thread in threads:
+            thread.join(timeout)
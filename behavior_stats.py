@@ -0,0 +1,132 @@
+import datetime
+import math
+from array import array
+
+# Streaming completion statistics with exponential time decay. Each task and each
+# hour of the day keeps a decayed count of completions and of all outcomes, so
+# memory and update cost stay flat no matter how much history is recorded.
+
+PRIOR_RATE = 0.5
+PRIOR_WEIGHT = 2.0
+
+
+def _days(when):
+    return (when or datetime.datetime.now()).timestamp() / 86400.0
+
+
+class DecayedCounters:
+    # Parallel fixed-width arrays: decayed completions, decayed outcomes and the time they were last decayed to
+
+    def __init__(self, size, half_life_days):
+        self.rate = math.log(2) / half_life_days
+        self.done = array('d', [0.0] * size)
+        self.total = array('d', [0.0] * size)
+        self.updated = array('d', [0.0] * size)
+
+    def grow(self):
+        self.done.append(0.0)
+        self.total.append(0.0)
+        self.updated.append(0.0)
+        return len(self.done) - 1
+
+    def _decay(self, i, now):
+        elapsed = now - self.updated[i]
+        if elapsed > 0:
+            factor = math.exp(-self.rate * elapsed)
+            self.done[i] *= factor
+            self.total[i] *= factor
+            self.updated[i] = now
+
+    def add(self, i, completed, now):
+        self._decay(i, now)
+        self.total[i] += 1.0
+        if completed:
+            self.done[i] += 1.0
+
+    def completion_rate(self, i, now):
+        self._decay(i, now)
+        return (self.done[i] + PRIOR_RATE * PRIOR_WEIGHT) / (self.total[i] + PRIOR_WEIGHT)
+
+
+class BehaviorStats:
+    def __init__(self, half_life_days=30.0):
+        self.half_life_days = half_life_days
+        self.events = 0
+        self._task_index = {}
+        self._task_names = []
+        self._tasks = DecayedCounters(0, half_life_days)
+        self._hours = DecayedCounters(24, half_life_days)
+
+    def __contains__(self, task):
+        return task in self._task_index
+
+    def tasks(self):
+        return list(self._task_names)
+
+    def _add_task(self, task):
+        index = self._task_index[task] = self._tasks.grow()
+        self._task_names.append(task)
+        return index
+
+    def record(self, task, completed, when=None):
+        now = _days(when)
+        index = self._task_index.get(task)
+        if index is None:
+            index = self._add_task(task)
+            self._tasks.updated[index] = now
+        self._tasks.add(index, completed, now)
+        self._hours.add((when or datetime.datetime.now()).hour, completed, now)
+        self.events += 1
+
+    def forget(self, task):
+        # Drop a task that left the catalog; its slot is reused by swapping in the last one
+        index = self._task_index.pop(task, None)
+        if index is None:
+            return
+        last = len(self._task_names) - 1
+        if index != last:
+            moved = self._task_names[last]
+            self._task_index[moved] = index
+            self._task_names[index] = moved
+            for column in (self._tasks.done, self._tasks.total, self._tasks.updated):
+                column[index] = column[last]
+        self._task_names.pop()
+        for column in (self._tasks.done, self._tasks.total, self._tasks.updated):
+            column.pop()
+
+    def task_rate(self, task, when=None):
+        # Smoothed completion rate; tasks never seen get the prior of 0.5
+        index = self._task_index.get(task)
+        if index is None:
+            return PRIOR_RATE
+        return self._tasks.completion_rate(index, _days(when))
+
+    def hour_rate(self, hour, when=None):
+        return self._hours.completion_rate(hour, _days(when))
+
+    def task_weight(self, task, when=None):
+        # Sampling multiplier in (0, 2): 1.0 for unknown tasks, higher for tasks that get done
+        return 2.0 * self.task_rate(task, when)
+
+    def to_dict(self):
+        return {
+            "half_life_days": self.half_life_days,
+            "events": self.events,
+            "tasks": {
+                task: [self._tasks.done[i], self._tasks.total[i], self._tasks.updated[i]]
+                for task, i in self._task_index.items()
+            },
+            "hours": [list(self._hours.done), list(self._hours.total), list(self._hours.updated)],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls(data.get("half_life_days", 30.0))
+        stats.events = data.get("events", 0)
+        for task, (done, total, updated) in data.get("tasks", {}).items():
+            index = stats._add_task(task)
+            stats._tasks.done[index], stats._tasks.total[index], stats._tasks.updated[index] = done, total, updated
+        hours = data.get("hours")
+        if hours:
+            stats._hours.done, stats._hours.total, stats._hours.updated = (array('d', column) for column in hours)
+        return stats
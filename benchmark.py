@@ -0,0 +1,553 @@
+import argparse
+import datetime
+import gc
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from background_executor import BackgroundExecutor
+from calendar_io import read_busy_file, write_ics
+from goal_planner import GoalPlanner
+from metrics import Metrics
+from model_registry import ModelRegistry
+from mood_scorer import LexiconScorer, MoodCascade
+from reminders import ReminderScheduler
+from schedule_engine import DEFAULT_DAILY_TASKS, ScheduleEngine
+from schedule_index import ScheduleIndex
+from schedule_view import ScheduleView
+from sentiment_service import SentimentService
+from storage import Store
+from task_index import TaskIndex
+
+# Headless benchmark suite. Models are replaced with stubs so it runs offline.
+#
+#   python benchmark.py                 # run and compare against benchmark_baseline.json if present
+#   python benchmark.py --save          # run and store the results as the new baseline
+#   python benchmark.py --only nlp      # run benchmarks whose name contains "nlp"
+#   python benchmark.py --only cli      # only check CLI startup imports against --import-budget
+
+DEFAULT_BASELINE = "benchmark_baseline.json"
+DEFAULT_THRESHOLD = 0.25  # Fail when time or peak memory grows by more than 25%
+BENCH_DAY = datetime.date(2025, 1, 6)
+
+# CLI commands must start within this budget (measured with -X importtime) and never import these
+IMPORT_BUDGET_MS = 150
+HEAVY_MODULES = ("torch", "transformers", "tkinter", "ttkbootstrap", "numpy")
+CLI_COMMANDS = {
+    "cli_import/generate": ["generate", "--seed", "0"],
+    "cli_import/log-mood-fast": ["log-mood", "feeling great", "--fast"],
+}
+
+
+def stub_sentiment(texts):
+    # Offline stand-in for the transformers sentiment pipeline
+    if isinstance(texts, str):
+        texts = [texts]
+    return [{"label": "NEGATIVE" if "tired" in text.lower() else "POSITIVE", "score": 0.99} for text in texts]
+
+
+class StubTreeview:
+    # Just enough of ttk.Treeview for the rendering code paths
+    def __init__(self):
+        self._rows = {}
+        self._order = []
+        self._next_id = 0
+
+    def get_children(self, item=""):
+        return tuple(self._order)
+
+    def delete(self, *items):
+        for item in items:
+            del self._rows[item]
+            self._order.remove(item)
+
+    def insert(self, parent, index, iid=None, values=()):
+        if iid is None:
+            self._next_id += 1
+            iid = f"I{self._next_id:05d}"
+        self._rows[iid] = tuple(values)
+        if index == "end":
+            self._order.append(iid)
+        else:
+            self._order.insert(index, iid)
+        return iid
+
+    def item(self, iid, values=None):
+        if values is not None:
+            self._rows[iid] = tuple(values)
+        return {"values": self._rows[iid]}
+
+    def exists(self, iid):
+        return iid in self._rows
+
+    def move(self, iid, parent, index):
+        self._order.remove(iid)
+        self._order.insert(index, iid)
+
+    def yview_moveto(self, fraction):
+        pass
+
+
+class StubEntry:
+    def __init__(self, text=""):
+        self.text = text
+
+    def get(self):
+        return self.text
+
+    def delete(self, first, last=None):
+        self.text = ""
+
+
+class StubText:
+    def __init__(self):
+        self.text = ""
+
+    def config(self, **options):
+        pass
+
+    def delete(self, first, last=None):
+        self.text = ""
+
+    def insert(self, index, text):
+        self.text += text
+
+
+def headless_manager(store_path, day=BENCH_DAY):
+    # Build a DailyLifeManager without creating a Tk window; it schedules day rather than today
+    from daily_life_manager import DailyLifeManager
+
+    manager = DailyLifeManager.__new__(DailyLifeManager)
+    manager.engine = ScheduleEngine(seed=0, start_day=day)
+    manager.models = ModelRegistry()
+    manager.models.register("sentiment", lambda: stub_sentiment)
+    manager.sentiment = SentimentService(lambda: manager.sentiment_analyzer)
+    manager.mood_scorer = MoodCascade([("lexicon", LexiconScorer()), ("model", manager.sentiment.score)])
+    manager.store = Store(store_path)
+    manager.reminders = ReminderScheduler(lambda reminder: None)
+    manager.schedule_tree = StubTreeview()
+    manager.schedule_view = ScheduleView(manager.schedule_tree)
+    manager.executor = BackgroundExecutor()
+    manager.displayed_slots = []
+    manager.fixed_day = day
+    return manager
+
+
+def nlp_corpus(size, seed=0):
+    rng = random.Random(seed)
+    nouns = ["gym", "report", "groceries", "thesis", "garden", "portfolio", "budget", "novel", "french", "guitar"]
+    corpus = []
+    for i in range(size):
+        noun = f"{rng.choice(nouns)} {i}"
+        deadline = f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        corpus.append(rng.choice([
+            f"Add task {noun}",
+            f"add target Finish {noun} by {deadline}",
+            f"Add yearly task Master {noun} by {deadline}",
+            f"add complex task Launch {noun} by {deadline}",
+            f"add target {noun} by someday",
+            f"please remind me about {noun}",
+        ]))
+    return corpus
+
+
+def large_schedule(slots):
+    index = ScheduleIndex()
+    for minute in range(slots):
+        index.add(minute, minute + 1, f"Task {minute}")
+    return index
+
+
+def bench_generate(task_count):
+    def setup():
+        engine = ScheduleEngine(seed=0)
+        engine.catalog.add_many(f"Task {i}" for i in range(task_count))
+        engine.record_outcome("Exercise", True, datetime.datetime(2025, 1, 1, 8))
+        return engine
+
+    def run(engine):
+        engine.generate_daily_schedule(BENCH_DAY)
+    return setup, run
+
+
+def bench_regenerate(edit, calls=1000):
+    # Regenerating a day that is already built: unchanged, or after pinning a manual edit
+    def setup():
+        engine = ScheduleEngine(seed=0)
+        engine.catalog.add_many(f"Task {i}" for i in range(100))
+        engine.record_outcome("Exercise", True, datetime.datetime(2025, 1, 1, 8))
+        engine.generate_daily_schedule(BENCH_DAY)
+        return engine
+
+    def run(engine):
+        start = engine.template[0][0]
+        for i in range(calls):
+            if edit:
+                engine.adjust_task(start, f"Edit {i}")
+            engine.generate_daily_schedule(BENCH_DAY)
+    return setup, run
+
+
+def bench_generate_range(days):
+    def setup():
+        engine = ScheduleEngine(seed=0, start_day=BENCH_DAY)
+        engine.add_target("Benchmark report", BENCH_DAY + datetime.timedelta(days=days))
+        return engine
+
+    def run(engine):
+        engine.generate_range(BENCH_DAY, days)
+    return setup, run
+
+
+def bench_behavior_stats(events=100000):
+    rng = random.Random(0)
+    start = datetime.datetime(2020, 1, 1)
+    outcomes = [
+        (f"Task {rng.randrange(200)}", rng.random() < 0.7, start + datetime.timedelta(hours=i))
+        for i in range(events)
+    ]
+
+    def setup():
+        engine = ScheduleEngine(seed=0)
+        engine.catalog.add_many(f"Task {i}" for i in range(200))
+        return engine
+
+    def run(engine):
+        # Years of hourly outcomes; memory must not grow with the number of events
+        for task, completed, when in outcomes:
+            engine.record_outcome(task, completed, when)
+    return setup, run
+
+
+def bench_choose_task(stress_level, calls=1000):
+    def setup():
+        engine = ScheduleEngine(seed=0)
+        engine.catalog.add_many(f"Task {i}" for i in range(5000))
+        engine.user_preferences["stress_level"] = stress_level
+        engine.record_outcome("Exercise", True, datetime.datetime(2025, 1, 1, 8))
+        return engine
+
+    def run(engine):
+        for _ in range(calls):
+            engine.choose_task()
+    return setup, run
+
+
+def bench_goal_planner(goals=365, changes=50):
+    rng = random.Random(0)
+    specs = [
+        (f"Goal {i}", rng.choice(["target", "yearly", "complex"]), BENCH_DAY + datetime.timedelta(days=rng.randint(1, 365)))
+        for i in range(goals)
+    ]
+
+    def setup():
+        return GoalPlanner(start=BENCH_DAY, capacity=135)
+
+    def run(planner):
+        # Plan a full year, then re-plan incrementally after single-goal changes
+        for spec in specs:
+            planner.add_goal(*spec)
+        planner.allocations_on(BENCH_DAY)
+        for i in range(changes):
+            name, kind, deadline = specs[i]
+            planner.add_goal(name, kind, deadline + datetime.timedelta(days=7))
+            planner.allocations_on(BENCH_DAY)
+    return setup, run
+
+
+def bench_goal_expiry(goals=3000, days=300):
+    # Expire goals day by day; the task pool should shrink back to the defaults
+    def setup():
+        engine = ScheduleEngine(seed=0, start_day=BENCH_DAY)
+        for i in range(goals):
+            engine.add_target(f"Goal {i}", BENCH_DAY + datetime.timedelta(days=i % days))
+        return engine
+
+    def run(engine):
+        for offset in range(days + 1):
+            engine.expire_goals(BENCH_DAY + datetime.timedelta(days=offset))
+        assert len(engine.catalog) == len(DEFAULT_DAILY_TASKS), len(engine.catalog)
+    return setup, run
+
+
+def bench_task_index(tasks=100000, queries=1000):
+    # Similarity search in a large catalog; queries are misspelled or reworded versions of its tasks
+    rng = random.Random(0)
+    words = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 9))) for _ in range(5000)]
+    names = [" ".join(rng.choice(words) for _ in range(rng.randint(1, 4))).capitalize() for _ in range(tasks)]
+    corpus = [f"go to {name[:-1].lower()}" for name in rng.sample(names, queries)]
+
+    def setup():
+        index = TaskIndex()
+        index.add_many(names)
+        return index
+
+    def run(index):
+        for text in corpus:
+            index.resolve(text)
+    return setup, run
+
+
+def bench_nlp(workdir, size=2000):
+    corpus = nlp_corpus(size)
+
+    def setup():
+        return headless_manager(os.path.join(workdir, f"nlp-{time.perf_counter_ns()}.db")), StubText()
+
+    def run(state):
+        manager, output = state
+        for command in corpus:
+            manager.process_nlp_command(StubEntry(command), output)
+        manager.executor.wait()
+        manager.store.flush()
+    return setup, run
+
+
+def bench_import_commands(workdir, size=10000):
+    corpus = nlp_corpus(size)
+
+    def setup():
+        return headless_manager(os.path.join(workdir, f"import-{time.perf_counter_ns()}.db"))
+
+    def run(manager):
+        manager.import_commands(corpus)
+        manager.executor.wait()
+        manager.store.flush()
+    return setup, run
+
+
+def bench_import_busy(workdir, events=20000):
+    # Stream an .ics file into a fresh store, then generate a day that has busy blocks
+    path = os.path.join(workdir, f"busy-{events}.ics")
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        write_ics(
+            ((BENCH_DAY + datetime.timedelta(days=i % 365), 480 + 15 * (i % 40), 540 + 15 * (i % 40), f"Meeting {i}")
+             for i in range(events)), f
+        )
+
+    def setup():
+        return Store(os.path.join(workdir, f"busy-{time.perf_counter_ns()}.db"))
+
+    def run(store):
+        store.import_busy(read_busy_file(path), "busy.ics")
+        engine = ScheduleEngine(seed=0, start_day=BENCH_DAY)
+        engine.busy_source = store.busy_between
+        engine.generate_daily_schedule(BENCH_DAY)
+        store.close()
+    return setup, run
+
+
+def bench_render(workdir, slots):
+    def setup():
+        manager = headless_manager(os.path.join(workdir, f"render-{time.perf_counter_ns()}.db"))
+        if slots:
+            manager.engine.schedule = large_schedule(slots)
+        else:
+            manager.engine.generate_daily_schedule(BENCH_DAY)
+        return manager
+
+    def run(manager):
+        for _ in range(10):
+            manager.refresh_schedule_display()
+    return setup, run
+
+
+def bench_render_range(workdir, days):
+    def setup():
+        manager = headless_manager(os.path.join(workdir, f"range-{time.perf_counter_ns()}.db"))
+        manager.engine.add_target("Benchmark report", BENCH_DAY + datetime.timedelta(days=days))
+        return manager, manager.engine.generate_range(BENCH_DAY, days)
+
+    def run(state):
+        # Render the range, then scroll through it a page at a time as a user would
+        manager, calendar = state
+        manager.show_range(calendar)
+        view = manager.schedule_view
+        while view.top + view.visible_rows < len(view.rows):
+            view.yview("scroll", 1, "pages")
+    return setup, run
+
+
+def bench_metrics(enabled, calls=100000):
+    def setup():
+        metrics = Metrics(enabled=enabled)
+        return metrics.timed("noop")(lambda: None)
+
+    def run(hooked):
+        # Cost of the hook itself around an empty call; must stay near zero when disabled
+        for _ in range(calls):
+            hooked()
+    return setup, run
+
+
+def bench_sentiment(texts=5000):
+    corpus = [f"Feeling {'tired' if i % 3 else 'great'} today, entry {i % 1000}" for i in range(texts)]
+
+    def setup():
+        return SentimentService(lambda: stub_sentiment)
+
+    def run(service):
+        service.score_many(corpus)
+        service.close()
+    return setup, run
+
+
+def bench_mood_cascade(texts=5000):
+    moods = ["great", "so exhausted", "Feeling really happy today", "not sure how I feel", "good but very tired",
+             "not bad", "overwhelmed and anxious", "fine I guess", "the meeting moved to noon", "calm and focused"]
+    corpus = [f"{moods[i % len(moods)]} ({i % 1000})" for i in range(texts)]
+
+    def setup():
+        return MoodCascade([("lexicon", LexiconScorer()), ("model", lambda text: stub_sentiment(text)[0])])
+
+    def run(cascade):
+        for text in corpus:
+            cascade.score(text)
+    return setup, run
+
+
+def benchmarks(workdir):
+    return {
+        "generate_daily_schedule/small": bench_generate(10),
+        "generate_daily_schedule/large": bench_generate(100000),
+        "regenerate_daily_schedule/unchanged": bench_regenerate(False),
+        "regenerate_daily_schedule/edited": bench_regenerate(True),
+        "generate_range/7": bench_generate_range(7),
+        "generate_range/90": bench_generate_range(90),
+        "choose_task/low": bench_choose_task("low"),
+        "choose_task/normal": bench_choose_task("normal"),
+        "choose_task/high": bench_choose_task("high"),
+        "goal_planner/year": bench_goal_planner(),
+        "goal_expiry/3000": bench_goal_expiry(),
+        "behavior_stats/100000": bench_behavior_stats(),
+        "task_index/100000": bench_task_index(),
+        "process_nlp_command/2000": bench_nlp(workdir),
+        "import_commands/10000": bench_import_commands(workdir),
+        "import_busy/20000": bench_import_busy(workdir),
+        "refresh_schedule_display/day": bench_render(workdir, 0),
+        "refresh_schedule_display/1440": bench_render(workdir, 1440),
+        "show_range/90": bench_render_range(workdir, 90),
+        "sentiment_service/5000": bench_sentiment(),
+        "mood_cascade/5000": bench_mood_cascade(),
+        "metrics_hook/off/100000": bench_metrics(False),
+        "metrics_hook/on/100000": bench_metrics(True),
+    }
+
+
+def import_profile(argv, workdir):
+    # Run cli.py under -X importtime; returns (total import milliseconds, names of imported modules)
+    cli = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cli.py")
+    command = [sys.executable, "-X", "importtime", cli, "--db", os.path.join(workdir, "cli.db")] + argv
+    completed = subprocess.run(command, capture_output=True, text=True, cwd=workdir)
+    if completed.returncode != 0:
+        raise RuntimeError(f"{' '.join(argv)} failed: {completed.stderr.strip().splitlines()[-1:]}")
+    total_us, modules = 0, set()
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # Header line
+        modules.add(name.strip())
+        if not name[1:].startswith(" "):
+            total_us += int(cumulative)  # Only top-level imports, nested ones are included in them
+    return total_us / 1000, modules
+
+
+def check_imports(workdir, budget_ms, only=""):
+    failures = []
+    for name, argv in CLI_COMMANDS.items():
+        if only not in name:
+            continue
+        total_ms, modules = import_profile(argv, workdir)
+        heavy = sorted(module for module in modules if module.split(".")[0] in HEAVY_MODULES)
+        print(f"{name:36} {total_ms:10.2f} ms {'':>14}(budget {budget_ms:g} ms)")
+        if total_ms > budget_ms:
+            failures.append(f"{name}: imports took {total_ms:.1f} ms, budget {budget_ms:g} ms")
+        if heavy:
+            failures.append(f"{name}: imported {', '.join(heavy)}")
+    return failures
+
+
+def measure(setup, run, repeat):
+    times = []
+    for _ in range(repeat):
+        state = setup()
+        gc.collect()
+        start = time.perf_counter()
+        run(state)
+        times.append(time.perf_counter() - start)
+
+    # Peak memory comes from a separate pass so tracing does not skew the timings
+    state = setup()
+    gc.collect()
+    tracemalloc.start()
+    run(state)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"seconds": statistics.median(times), "peak_bytes": peak}
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric in ("seconds", "peak_bytes"):
+            if base[metric] and result[metric] > base[metric] * (1 + threshold):
+                regressions.append(f"{name}: {metric} {base[metric]:.6g} -> {result[metric]:.6g}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the headless benchmark suite.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="save results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed relative regression")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark")
+    parser.add_argument("--only", default="", help="run benchmarks whose name contains this text")
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET_MS, help="CLI startup import budget in ms")
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, (setup, run) in benchmarks(workdir).items():
+            if args.only not in name:
+                continue
+            results[name] = measure(setup, run, args.repeat)
+            print(f"{name:36} {results[name]['seconds'] * 1000:10.2f} ms {results[name]['peak_bytes'] / 1024:10.1f} KiB")
+        # The import budget is absolute rather than relative to the baseline
+        import_failures = check_imports(workdir, args.import_budget, args.only)
+    for failure in import_failures:
+        print(f"OVER BUDGET {failure}")
+
+    if args.save:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return 1 if import_failures else 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save to create one.")
+        return 1 if import_failures else 0
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions or import_failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
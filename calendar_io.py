@@ -0,0 +1,274 @@
+import csv
+import datetime
+import json
+import os
+import re
+
+from schedule_index import MINUTES_PER_DAY, format_slot, parse_minute
+
+# Streaming calendar export and import. Events are (date, start_minute, end_minute, task)
+# tuples and pass through generators, so a year-long plan is written, and a calendar
+# file with tens of thousands of events is read, without holding it all in memory.
+#
+#   python cli.py export --format ics --days 28 --output plan.ics
+#   python cli.py import-busy work.ics
+
+BUSY_TASK = "Busy"  # Label for imported events without a summary
+MAX_EVENT_DAYS = 366  # Longer events are clipped rather than expanded day by day
+
+_PRODID = "-//Daily Life Manager//Schedule Export//EN"
+_PROPERTY_RE = re.compile(r'^([^:;]+)((?:;[^:;=]+=(?:"[^"]*"|[^:;"]*)(?:,(?:"[^"]*"|[^:;,"]*))*)*):(.*)$')
+_PARAM_RE = re.compile(r';([^:;=]+)=("[^"]*"|[^:;"]*)')
+# Everything else in a calendar file is skipped without parsing its parameters
+_PARSED_PROPERTIES = frozenset(["BEGIN", "END", "DTSTART", "DTEND", "DURATION", "SUMMARY", "TRANSP", "STATUS"])
+_DURATION_RE = re.compile(r"^([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+
+
+def plan_events(engine, start, days, chunk_days=28):
+    # Generate days chunk by chunk with ScheduleEngine.generate_range and yield their slots in order
+    offset = 0
+    while offset < days:
+        count = min(chunk_days, days - offset)
+        calendar = engine.generate_range(start + datetime.timedelta(days=offset), count)
+        for row in range(calendar.days):
+            day = calendar.date(row)
+            for slot in calendar.day_slots(row):
+                yield day, slot.start, slot.end, slot.task
+        offset += count
+
+
+# Writing; each writer returns the number of events written
+
+
+def _ics_escape(text):
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _ics_fold(line):
+    # Lines longer than 75 octets continue on the next line after a space
+    if len(line.encode("utf-8")) <= 75:
+        return line + "\r\n"
+    parts, current, size = [], "", 0
+    for char in line:
+        width = len(char.encode("utf-8"))
+        if size + width > (75 if not parts else 74):
+            parts.append(current)
+            current, size = "", 0
+        current += char
+        size += width
+    parts.append(current)
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _ics_datetime(day, minute):
+    # Floating local time; the end of a day is midnight of the next one
+    moment = datetime.datetime.combine(day, datetime.time()) + datetime.timedelta(minutes=minute)
+    return moment.strftime("%Y%m%dT%H%M%S")
+
+
+def write_ics(events, out):
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    out.write(f"BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:{_PRODID}\r\nCALSCALE:GREGORIAN\r\n")
+    count = 0
+    for day, start, end, task in events:
+        out.write(
+            "BEGIN:VEVENT\r\n"
+            f"UID:{day.isoformat()}-{start}@daily-life-manager\r\n"
+            f"DTSTAMP:{stamp}\r\n"
+            f"DTSTART:{_ics_datetime(day, start)}\r\n"
+            f"DTEND:{_ics_datetime(day, end)}\r\n"
+            + _ics_fold(f"SUMMARY:{_ics_escape(task)}")
+            + "END:VEVENT\r\n"
+        )
+        count += 1
+    out.write("END:VCALENDAR\r\n")
+    return count
+
+
+def write_csv(events, out):
+    writer = csv.writer(out)
+    writer.writerow(["day", "time", "task"])
+    count = 0
+    for day, start, end, task in events:
+        writer.writerow([day.isoformat(), format_slot(start, end), task])
+        count += 1
+    return count
+
+
+def write_json(events, out):
+    # A JSON array written one element at a time
+    count = 0
+    for day, start, end, task in events:
+        out.write("[\n  " if not count else ",\n  ")
+        out.write(json.dumps({"day": day.isoformat(), "time": format_slot(start, end), "task": task}))
+        count += 1
+    out.write("\n]\n" if count else "[]\n")
+    return count
+
+
+WRITERS = {"ics": write_ics, "csv": write_csv, "json": write_json}
+
+
+# Reading; readers yield busy blocks and count what they had to skip in counts["skipped"]
+
+
+def _split_days(start, end, task):
+    # Yield (date, start_minute, end_minute, task) for each day a [start, end) datetime span touches
+    end = min(end, start + datetime.timedelta(days=MAX_EVENT_DAYS))
+    day = start.date()
+    while True:
+        midnight = datetime.datetime.combine(day, datetime.time())
+        first = max(start, midnight)
+        last = min(end, midnight + datetime.timedelta(days=1))
+        if last <= first:
+            return
+        first_minute = (first - midnight).seconds // 60
+        last_minute = MINUTES_PER_DAY if last - midnight >= datetime.timedelta(days=1) else -(-(last - midnight).seconds // 60)
+        if last_minute > first_minute:
+            yield day, first_minute, last_minute, task
+        day += datetime.timedelta(days=1)
+
+
+def _unfold(lines):
+    current = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current:
+        yield current
+
+
+def _ics_unescape(text):
+    return re.sub(r"\\([\\;,nN])", lambda m: "\n" if m.group(1) in "nN" else m.group(1), text)
+
+
+def _ics_zone(name):
+    # Unknown zones, and every zone on Python before 3.9 (no zoneinfo), are read as local time
+    try:
+        import zoneinfo
+    except ImportError:
+        return None
+    try:
+        return zoneinfo.ZoneInfo(name)
+    except (ValueError, zoneinfo.ZoneInfoNotFoundError):
+        return None
+
+
+def _ics_value(value, params):
+    # (datetime, is_all_day) in local time; UTC and TZID times are converted to the local zone
+    value = value.strip()
+    date = datetime.datetime(int(value[0:4]), int(value[4:6]), int(value[6:8]))
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return date, True
+    if value[8:9] != "T" or len(value) not in (15, 16):
+        raise ValueError(f"Invalid date-time '{value}'")
+    moment = date.replace(hour=int(value[9:11]), minute=int(value[11:13]), second=int(value[13:15]))
+    zone = datetime.timezone.utc if value.endswith("Z") else None
+    if zone is None and "TZID" in params:
+        zone = _ics_zone(params["TZID"].strip('"'))
+    if zone is not None:
+        moment = moment.replace(tzinfo=zone).astimezone().replace(tzinfo=None)
+    return moment, False
+
+
+def _ics_duration(value):
+    match = _DURATION_RE.match(value.strip())
+    if not match:
+        raise ValueError(f"Invalid duration '{value}'")
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    duration = datetime.timedelta(weeks=int(weeks or 0), days=int(days or 0), hours=int(hours or 0),
+                                  minutes=int(minutes or 0), seconds=int(seconds or 0))
+    return -duration if sign == "-" else duration
+
+
+def _ics_event(props):
+    # Busy blocks for one VEVENT; transparent and cancelled events do not block time.
+    # Recurring events only block their first occurrence.
+    if props.get("TRANSP", ("", {}))[0].upper() == "TRANSPARENT" or props.get("STATUS", ("", {}))[0].upper() == "CANCELLED":
+        return
+    start, all_day = _ics_value(*props["DTSTART"])
+    if "DTEND" in props:
+        end = _ics_value(*props["DTEND"])[0]
+    elif "DURATION" in props:
+        end = start + _ics_duration(props["DURATION"][0])
+    else:
+        end = start + datetime.timedelta(days=1 if all_day else 0)
+    summary = " ".join(_ics_unescape(props.get("SUMMARY", ("", {}))[0]).split()) or BUSY_TASK
+    yield from _split_days(start, end, summary)
+
+
+def read_ics(lines, counts=None):
+    counts = counts if counts is not None else {}
+    counts.setdefault("skipped", 0)
+    props = None
+    nested = 0  # Depth of components inside the current event, such as VALARM
+    for line in _unfold(lines):
+        head, colon, value = line.partition(":")
+        name, semicolon, params = head.partition(";")
+        name = name.upper()
+        if not colon or name not in _PARSED_PROPERTIES:
+            continue
+        params = semicolon + params
+        if '"' in params:
+            # Quoted parameter values may contain ':'
+            match = _PROPERTY_RE.match(line)
+            if not match:
+                continue
+            params, value = match.group(2), match.group(3)
+        if name == "BEGIN":
+            if value.upper() == "VEVENT" and props is None:
+                props = {}
+            elif props is not None:
+                nested += 1
+        elif name == "END":
+            if nested:
+                nested -= 1
+            elif value.upper() == "VEVENT" and props is not None:
+                try:
+                    yield from _ics_event(props)
+                except (KeyError, ValueError):
+                    counts["skipped"] += 1
+                props = None
+        elif props is not None and not nested and name not in props:
+            props[name] = (value, {key.upper(): val for key, val in _PARAM_RE.findall(params)})
+
+
+def read_csv(lines, counts=None):
+    # Rows with day and either time ("9:00 AM - 10:00 AM") or start and end columns; task is optional
+    counts = counts if counts is not None else {}
+    counts.setdefault("skipped", 0)
+    for row in csv.DictReader(lines):
+        try:
+            day = datetime.date.fromisoformat(row["day"].strip())
+            if row.get("time"):
+                start_text, _, end_text = row["time"].partition(" - ")
+            else:
+                start_text, end_text = row["start"], row["end"]
+            start, end = parse_minute(start_text), parse_minute(end_text)
+            if end == 0:
+                end = MINUTES_PER_DAY  # "11:00 PM - 12:00 AM" ends at midnight
+            if end <= start:
+                raise ValueError("ends before it starts")
+        except (KeyError, TypeError, ValueError, AttributeError):
+            counts["skipped"] += 1
+            continue
+        yield day, start, end, (row.get("task") or "").strip() or BUSY_TASK
+
+
+READERS = {"ics": read_ics, "csv": read_csv}
+
+
+def file_format(path):
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    return "ics" if extension in ("ics", "ical", "ifb") else "csv"
+
+
+def read_busy_file(path, fmt=None, counts=None):
+    # Yield busy blocks from a calendar file, reading it line by line
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        yield from READERS[fmt or file_format(path)](f, counts)
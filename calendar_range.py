@@ -0,0 +1,113 @@
+import datetime
+
+import numpy as np
+
+from schedule_index import Slot
+
+# Multi-day calendars at 15-minute resolution. Each day is a row of a (days x slots)
+# matrix of entry ids (0 = free), so template blocks, fixed appointments and free-gap
+# detection are whole-range array operations instead of per-day loops.
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+FREE = 0
+
+
+def _slot_ranges(starts, ends):
+    # Expand [start, end) slot ranges into (which range, slot) index arrays without a Python loop
+    lengths = np.maximum(ends - starts, 0)
+    total = int(lengths.sum())
+    owners = np.repeat(np.arange(len(starts)), lengths)
+    offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return owners, np.repeat(starts, lengths) + offsets
+
+
+def sample_alias(table, generator, count):
+    # Vectorized draw of count items from a task_catalog.AliasTable
+    prob = np.asarray(table.prob)
+    alias = np.asarray(table.alias)
+    picks = generator.integers(0, len(prob), count)
+    picks = np.where(generator.random(count) < prob[picks], picks, alias[picks])
+    return [table.items[i] for i in picks]
+
+
+class CalendarRange:
+    def __init__(self, start, days):
+        self.start = start
+        self.days = days
+        self.grid = np.zeros((days, SLOTS_PER_DAY), dtype=np.int32)
+        self.labels = [None]  # Entry id -> task text; id 0 is free
+
+    def label_id(self, label):
+        self.labels.append(label)
+        return len(self.labels) - 1
+
+    def date(self, row):
+        return self.start + datetime.timedelta(days=row)
+
+    def busy(self):
+        return self.grid != FREE
+
+    def apply_template(self, slots, weekdays=None):
+        # Stamp (start_minute, end_minute, task) template slots onto every day, or only the given weekdays
+        row = np.zeros(SLOTS_PER_DAY, dtype=np.int32)
+        for start, end, task in slots:
+            row[start // SLOT_MINUTES:-(-end // SLOT_MINUTES)] = self.label_id(task)
+        if weekdays is None:
+            self.grid[:] = row
+        else:
+            first = self.start.weekday()
+            mask = np.isin((np.arange(self.days) + first) % 7, list(weekdays))
+            self.grid[mask] = row
+
+    def place(self, entries):
+        # Overwrite slots with fixed entries: iterable of (date, start_minute, end_minute, task)
+        rows, starts, ends, ids = [], [], [], []
+        for day, start, end, task in entries:
+            row = (day - self.start).days
+            if 0 <= row < self.days and end > start:
+                rows.append(row)
+                starts.append(start // SLOT_MINUTES)
+                ends.append(-(-end // SLOT_MINUTES))
+                ids.append(self.label_id(task))
+        if not rows:
+            return
+        owners, cols = _slot_ranges(np.array(starts), np.array(ends))
+        self.grid[np.array(rows)[owners], cols] = np.array(ids, dtype=np.int32)[owners]
+
+    def free_gaps(self, first_minute=0, last_minute=24 * 60):
+        # (rows, start_slots, end_slots) of every free run inside the window, across all days at once
+        lo, hi = first_minute // SLOT_MINUTES, -(-last_minute // SLOT_MINUTES)
+        free = self.grid[:, lo:hi] == FREE
+        edges = np.diff(np.pad(free, ((0, 0), (1, 1))).astype(np.int8), axis=1)
+        rows, starts = np.nonzero(edges == 1)
+        _, ends = np.nonzero(edges == -1)
+        return rows, starts + lo, ends + lo
+
+    def fill_gaps(self, rows, starts, ends, choose, chunk_slots=4):
+        # Split gaps into chunks of at most chunk_slots and label each with choose(row, start_slot, count)
+        counts = -(-(ends - starts) // chunk_slots)
+        owners, chunk_index = _slot_ranges(np.zeros(len(counts), dtype=np.int64), counts)
+        chunk_rows = rows[owners]
+        chunk_starts = starts[owners] + chunk_index * chunk_slots
+        chunk_ends = np.minimum(chunk_starts + chunk_slots, ends[owners])
+        labels = choose(chunk_rows, chunk_starts, len(chunk_rows))
+        base = len(self.labels)
+        self.labels.extend(labels)
+        ids = np.arange(base, base + len(labels), dtype=np.int32)
+        slot_owners, cols = _slot_ranges(chunk_starts, chunk_ends)
+        self.grid[chunk_rows[slot_owners], cols] = ids[slot_owners]
+
+    def day_slots(self, row):
+        # Merge runs of equal ids in one row into Slots; only called when rendering
+        line = self.grid[row]
+        changes = np.flatnonzero(np.diff(line)) + 1
+        bounds = np.concatenate(([0], changes, [SLOTS_PER_DAY]))
+        return [
+            Slot(int(a) * SLOT_MINUTES, int(b) * SLOT_MINUTES, self.labels[line[a]])
+            for a, b in zip(bounds[:-1], bounds[1:]) if line[a] != FREE
+        ]
+
+    def utilization(self, first_minute=0, last_minute=24 * 60):
+        lo, hi = first_minute // SLOT_MINUTES, -(-last_minute // SLOT_MINUTES)
+        return (self.grid[:, lo:hi] != FREE).mean(axis=1)
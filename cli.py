@@ -0,0 +1,180 @@
+import argparse
+import datetime
+import os
+import sqlite3
+import sys
+
+# Command-line entry point for scripts and cron jobs:
+#
+#   python cli.py generate --save
+#   python cli.py add-target "Finish report" --by 2025-12-31
+#   python cli.py export --format csv --output today.csv
+#   python cli.py export --format ics --days 28 --output month.ics
+#   python cli.py import-busy work.ics
+#   python cli.py log-mood "exhausted" --fast
+#   python cli.py template > timetable.txt
+#
+# Only the scheduling and storage modules are imported up front. Nothing here loads
+# Tk, and transformers is only imported by log-mood without --fast.
+
+from calendar_io import WRITERS, plan_events, read_busy_file
+from schedule_engine import ScheduleEngine, TIMETABLE_SLOTS
+from schedule_index import format_slot
+from schedule_template import format_template
+from storage import Store
+
+
+def _date(value):
+    try:
+        return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}', use YYYY-MM-DD")
+
+
+def _positive(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return number
+
+
+def open_engine(store, seed=None, day=None):
+    # The same saved state the GUI starts from
+    engine = ScheduleEngine(seed=seed, start_day=day)
+    store.import_pickle("user_preferences.pkl")
+    engine.user_preferences.update(store.load_preferences())
+    engine.load_state(store)
+    return engine
+
+
+def cmd_generate(args, store):
+    engine = open_engine(store, args.seed, args.date)
+    schedule = engine.generate_daily_schedule(args.date)
+    if args.save:
+        store.save_schedule(engine.schedule_day, schedule)
+        store.archive_goals(engine.take_archived())
+    for slot in schedule:
+        print(f"{format_slot(slot.start, slot.end):<21} {slot.task}")
+    return 0
+
+
+def cmd_add_target(args, store):
+    store.save_goal("target", args.name, args.by.isoformat())
+    print(f"Target '{args.name}' added with deadline {args.by.isoformat()}.")
+    return 0
+
+
+def cmd_export(args, store):
+    # One day exports the saved schedule, or a freshly generated one if none was saved;
+    # longer plans are generated a few weeks at a time and written as they come
+    day = args.date or datetime.date.today()
+    if args.days == 1:
+        slots = store.load_schedule(day)
+        if not slots:
+            slots = list(open_engine(store, args.seed, day).generate_daily_schedule(day))
+        events = ((day, start, end, task) for start, end, task in slots)
+    else:
+        events = plan_events(open_engine(store, args.seed, day), day, args.days)
+
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        count = WRITERS[args.format](events, out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if args.output:
+        print(f"Wrote {count} events to {args.output}.")
+    return 0
+
+
+def cmd_import_busy(args, store):
+    # Re-importing a file replaces the blocks it added last time
+    counts = {}
+    source = os.path.basename(args.path)
+    try:
+        imported = store.import_busy(read_busy_file(args.path, args.format, counts), source)
+    except (OSError, UnicodeDecodeError, sqlite3.Error) as e:
+        print(f"Could not import {args.path}: {e}")
+        return 1
+    print(f"Imported {imported} busy blocks from {source}" + (f", skipped {counts['skipped']} events." if counts["skipped"] else "."))
+    return 0
+
+
+def cmd_log_mood(args, store):
+    from mood_scorer import LexiconScorer, MoodCascade
+
+    tiers = [("lexicon", LexiconScorer())]
+    if not args.fast:
+        from model_registry import load_pipeline
+        tiers.append(("model", lambda text: load_pipeline("sentiment-analysis")(text)[0]))
+    cascade = MoodCascade(tiers)
+    threshold = store.load_preferences().get("mood_confidence_threshold", cascade.threshold)
+    result = cascade.score(args.text, threshold)
+
+    stress_level = {"NEGATIVE": "high", "POSITIVE": "low"}.get(result["label"], "normal")
+    store.set_preferences({"stress_level": stress_level})
+    print(f"Your mood has been logged as {stress_level} stress (scored by {result['tier']}, confidence {result['score']:.0%}).")
+    return 0
+
+
+def cmd_template(args, store):
+    # Print the timetable in template form, ready to edit and save as the template file
+    if args.default:
+        slots = TIMETABLE_SLOTS
+    else:
+        slots = open_engine(store).template
+    sys.stdout.write(format_template(slots))
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Daily Life Manager without the GUI.")
+    parser.add_argument("--db", default="daily_life_manager.db", help="database file (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="print the schedule for a day")
+    generate.add_argument("--date", type=_date, help="day to plan (default: today)")
+    generate.add_argument("--seed", type=int, help="random seed for reproducible output")
+    generate.add_argument("--save", action="store_true", help="save the schedule for the GUI and export")
+    generate.set_defaults(handler=cmd_generate)
+
+    add_target = commands.add_parser("add-target", help="add a target with a deadline")
+    add_target.add_argument("name")
+    add_target.add_argument("--by", type=_date, required=True, help="deadline (YYYY-MM-DD)")
+    add_target.set_defaults(handler=cmd_add_target)
+
+    export = commands.add_parser("export", help="write the schedule as CSV, JSON or iCalendar")
+    export.add_argument("--date", type=_date, help="first day to export (default: today)")
+    export.add_argument("--days", type=_positive, default=1, help="number of days to plan and export (default: 1)")
+    export.add_argument("--format", choices=sorted(WRITERS), default="csv")
+    export.add_argument("--output", help="file to write (default: standard output)")
+    export.add_argument("--seed", type=int, help="random seed if the day has to be generated")
+    export.set_defaults(handler=cmd_export)
+
+    import_busy = commands.add_parser("import-busy", help="block out the events of an .ics or CSV calendar file")
+    import_busy.add_argument("path")
+    import_busy.add_argument("--format", choices=["ics", "csv"], help="file format (default: from the extension)")
+    import_busy.set_defaults(handler=cmd_import_busy)
+
+    log_mood = commands.add_parser("log-mood", help="score a mood and update the stress level")
+    log_mood.add_argument("text")
+    log_mood.add_argument("--fast", action="store_true", help="use the offline word list only; never loads the model")
+    log_mood.set_defaults(handler=cmd_log_mood)
+
+    template = commands.add_parser("template", help="print the timetable template in use")
+    template.add_argument("--default", action="store_true", help="print the built-in timetable instead")
+    template.set_defaults(handler=cmd_template)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    store = Store(args.db)
+    try:
+        return args.handler(args, store)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
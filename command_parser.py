@@ -0,0 +1,57 @@
+import datetime
+import re
+from collections import namedtuple
+
+# Natural-language commands are parsed in a single regex pass into structured commands.
+# action is "task", "target", "yearly" or "complex"; None means the command was not understood
+# and feedback explains why.
+
+Command = namedtuple("Command", ["action", "name", "deadline", "feedback"])
+
+_COMMAND_RE = re.compile(r"\badd\s+(?P<kind>yearly\s+task|complex\s+task|target|task)\b(?P<rest>.*)", re.IGNORECASE | re.DOTALL)
+
+_GOALS = {
+    "target": ("Target", "target", "Add target Finish report by 2024-12-31"),
+    "yearly": ("Yearly task", "yearly task", "Add yearly task Complete certification by 2025-06-30"),
+    "complex": ("Complex task", "complex task", "Add complex task Launch project by 2024-11-15"),
+}
+
+UNRECOGNIZED = "Command not recognized. Try 'add task [task name]', 'add target [target] by [YYYY-MM-DD]', 'add yearly task [task] by [YYYY-MM-DD]', or 'add complex task [task] by [YYYY-MM-DD]'."
+
+
+def _error(feedback):
+    return Command(None, None, None, feedback)
+
+
+def parse_command(text):
+    match = _COMMAND_RE.search(text)
+    if not match:
+        return _error(UNRECOGNIZED)
+    action = match.group("kind").split(None, 1)[0].lower()
+    rest = match.group("rest").strip().lower()
+
+    if action == "task":
+        if not rest:
+            return _error("No task specified to add.")
+        name = rest.capitalize()
+        return Command("task", name, None, f"Task '{name}' has been added to your daily tasks.")
+
+    label, keyword, example = _GOALS[action]
+    name, separator, deadline = rest.rpartition(" by ")
+    name, deadline = name.strip(), deadline.strip()
+    if not separator or not name:
+        return _error(f"Please specify {keyword} and deadline using 'by'. Example: {example}.")
+    try:
+        datetime.datetime.strptime(deadline, '%Y-%m-%d')
+    except ValueError:
+        return _error("Invalid date format. Use YYYY-MM-DD.")
+    name = name.capitalize()
+    return Command(action, name, deadline, f"{label} '{name}' added with deadline {deadline}.")
+
+
+def iter_commands(lines):
+    # Parse a file or any iterable of lines lazily; blank lines and '#' comments are skipped
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line_no, parse_command(line)
@@ -1,14 +1,23 @@
 import datetime
+import os
 import random
-import tkinter as tk
-from tkinter import messagebox, ttk
-import pickle
-import threading
 import time
-
-# Importing NLP libraries
-from transformers import pipeline
-import torch
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+
+# NLP models are loaded lazily through the registry
+from background_executor import BackgroundExecutor
+from calendar_io import read_busy_file
+from command_parser import iter_commands, parse_command
+from metrics import METRICS, timed
+from model_registry import ModelRegistry, StartupTimer
+from mood_scorer import LexiconScorer, MoodCascade
+from schedule_engine import ScheduleEngine
+from reminders import ReminderScheduler
+from schedule_index import format_minute, format_slot, parse_slot
+from schedule_view import ScheduleView
+from sentiment_service import SentimentService
+from storage import Store
 
 # Importing ttkbootstrap for enhanced UI
 import ttkbootstrap as tb
@@ -16,187 +25,170 @@ from ttkbootstrap.constants import *
 
 class DailyLifeManager:
     def __init__(self):
-        self.schedule = {}
-        self.study_paths = [
-            "Advanced Math", "Physics", "Machine Learning", "Network Security", "Cryptography",
-            "Software Engineering", "Data Analysis", "Quantum Computing"
-        ]
-        self.daily_tasks = [
-            "Exercise", "Meal Prep", "Relax", "Meditation", "Grocery Shopping", "House Chores",
-            "Reading", "Creative Writing", "Project Work"
-        ]
-        self.breaks = ["Short Break", "Long Break"]
-        self.sleep_schedule = "Sleep"
-        self.targets = {}
-        self.yearly_tasks = {}
-        self.complex_tasks = {}
-        self.user_preferences = {
-            "productive_hours": (9, 17),  # Default productive hours from 9 AM to 5 PM
-            "preferred_tasks": [],
-            "stress_level": "normal"  # Can be "low", "normal", "high"
-        }
-        self.task_completion_history = []  # Track task completion for behavior learning
-        self.achievements = []  # Track achievements for motivation
-
-        # Load sentiment analysis model
-        self.sentiment_analyzer = pipeline("sentiment-analysis")
-
-        # Load NLP model for task parsing
-        self.nlp_model = pipeline("fill-mask", model="distilbert-base-uncased")
-
-        # Load user preferences
+        self.startup = StartupTimer()
+        # All scheduling state lives in the headless engine; this class is the Tk client
+        self.engine = ScheduleEngine()
+
+        # Reminders are delivered on the Tk thread through root.after
+        self.reminders = ReminderScheduler(lambda reminder: self.root.after(0, self.show_reminder, reminder))
+
+        # Register models; each one is only loaded when first needed, memory-mapped if it was exported for sharing
+        self.models = ModelRegistry(shared_dir=os.environ.get("DAILY_LIFE_MODEL_DIR"))
+        self.models.register_pipeline("sentiment", "sentiment-analysis")
+        self.models.register_pipeline("task_parser", "fill-mask", model="distilbert-base-uncased")
+
+        # Mood texts are scored in cached micro-batches
+        self.sentiment = SentimentService(lambda: self.sentiment_analyzer)
+        # Clear-cut moods are answered by the offline lexicon; only uncertain ones reach the model
+        self.mood_scorer = MoodCascade([("lexicon", LexiconScorer()), ("model", self.sentiment.score)])
+
+        # Engine work, saving and inference run on background lanes; results come back through poll_background_work
+        self.executor = BackgroundExecutor(on_error=self.show_background_error)
+        self.displayed_slots = []
+        self.fixed_day = None  # Day to schedule instead of today, e.g. for reproducible benchmarks
+
+        # Load user preferences and saved goals, tasks and history
+        self.store = Store()
         self.load_user_preferences()
+        self.load_saved_state()
+        METRICS.enabled = METRICS.enabled or bool(self.engine.user_preferences.get("metrics_enabled"))
+        self.startup.mark("preferences")
 
         # Initialize the GUI elements after the main window is created
         self.root = tb.Window(themename="flatly")  # Minimalistic theme
+        self.startup.mark("window")
         self.setup_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.startup.mark("ui")
 
         # Start the notification thread
         self.start_notification_thread()
+        self.startup.mark("notifications")
+
+        # Warm up the sentiment model once the window is on screen and release idle models periodically
+        self.root.after_idle(self.on_window_shown)
+        self.root.after(self.MODEL_SWEEP_MS, self.unload_idle_models)
+        self.root.after(self.POLL_MS, self.poll_background_work)
+        self.root.after(self.METRICS_EXPORT_MS, self.export_metrics)
+
+    MODEL_SWEEP_MS = 60 * 1000
+    POLL_MS = 50
+    METRICS_EXPORT_MS = 15 * 1000
+
+    @property
+    def sentiment_analyzer(self):
+        return self.models.get("sentiment")
+
+    @property
+    def nlp_model(self):
+        return self.models.get("task_parser")
+
+    def on_window_shown(self):
+        self.startup.mark("first paint")
+        print(self.startup.report())
+        self.models.warm_up("sentiment", on_done=self.report_model_warmup)
+
+    def report_model_warmup(self, errors):
+        for name, exc in errors.items():
+            print(f"Model '{name}' failed to load: {exc}")
+        for name, elapsed in self.models.load_timings.items():
+            print(f"Model '{name}' loaded in {elapsed:.2f} s")
+
+    def unload_idle_models(self):
+        for name in self.models.unload_idle():
+            print(f"Model '{name}' unloaded after being idle")
+        self.root.after(self.MODEL_SWEEP_MS, self.unload_idle_models)
+
+    def poll_background_work(self):
+        self.executor.drain()
+        busy = self.executor.pending() > 0
+        if busy != self.busy_shown:
+            self.busy_shown = busy
+            if busy:
+                self.busy_bar.start(15)
+                self.busy_label.config(text="Working...")
+            else:
+                self.busy_bar.stop()
+                self.busy_label.config(text="")
+        self.root.after(self.POLL_MS, self.poll_background_work)
+
+    def export_metrics(self):
+        # Keep the scrape file fresh while metrics are on
+        path = self.engine.user_preferences.get("metrics_path")
+        if METRICS.enabled and path:
+            try:
+                METRICS.write(path)
+            except OSError as e:
+                print(f"Could not write metrics to {path}: {e}")
+        self.root.after(self.METRICS_EXPORT_MS, self.export_metrics)
+
+    def show_background_error(self, exc):
+        messagebox.showerror("Error", f"Something went wrong: {exc}")
 
     def save_user_preferences(self):
-        with open("user_preferences.pkl", "wb") as f:
-            pickle.dump(self.user_preferences, f)
+        self.store.set_preferences(self.engine.user_preferences)
 
     def load_user_preferences(self):
-        try:
-            with open("user_preferences.pkl", "rb") as f:
-                self.user_preferences = pickle.load(f)
-        except FileNotFoundError:
-            pass
+        # Preferences used to be pickled; the store imports that file once
+        self.store.import_pickle("user_preferences.pkl")
+        self.engine.user_preferences.update(self.store.load_preferences())
 
-    def add_task(self, time, task):
-        self.schedule[time] = task
-        self.refresh_schedule_display()
+    def load_saved_state(self):
+        self.engine.load_state(self.store)
+        if self.engine.user_preferences.get("task_matching") == "model":
+            from task_index import model_embedder
 
-    def add_target(self, target, deadline):
-        self.targets[target] = deadline
-        self.break_down_target(target)
-
-    def add_yearly_task(self, yearly_task, deadline):
-        self.yearly_tasks[yearly_task] = deadline
-        self.break_down_yearly_task(yearly_task)
+            # Embedding the catalog loads the task parser model, so it happens in the background
+            self.executor.submit(self.engine.use_task_embeddings, model_embedder(lambda: self.nlp_model), lane="engine",
+                                 on_error=lambda exc: print(f"Matching tasks by n-grams; the task parser model failed: {exc}"))
 
-    def add_complex_task(self, complex_task, deadline):
-        self.complex_tasks[complex_task] = deadline
-        self.break_down_complex_task(complex_task)
-
-    def break_down_target(self, target):
-        # Break down a target into smaller tasks
-        tasks = [f"{target} - Step {i+1}" for i in range(5)]
-        for task in tasks:
-            self.daily_tasks.append(task)
-
-    def break_down_yearly_task(self, yearly_task):
-        # Break down a yearly task into monthly tasks
-        for month in range(1, 13):
-            task = f"{yearly_task} - Month {month}"
-            self.daily_tasks.append(task)
-
-    def break_down_complex_task(self, complex_task):
-        # Break down a complex task into weekly tasks
-        for week in range(1, 5):
-            task = f"{complex_task} - Week {week}"
-            self.daily_tasks.append(task)
-
-    def generate_daily_schedule(self):
-        self.schedule.clear()
-        # Set the current time to the start of the day you want (e.g., 5:45 AM)
-        current_time = datetime.datetime.now().replace(hour=5, minute=45, second=0, microsecond=0)
-        # Define end time (for example, 11:00 PM)
-        end_time = current_time.replace(hour=23)
-
-        productive_start, productive_end = self.user_preferences["productive_hours"]
-
-        # Define timetable segments
-        timetable = [
-            ("MORNING ROUTINE", "5:45 AM", "8:00 AM", [
-                ("5:45 AM - 6:00 AM", "Wake up & Hydrate"),
-                ("6:00 AM - 7:00 AM", "Exercise (Physical/Stretching)"),
-                ("7:00 AM - 8:00 AM", "Breakfast")
-            ]),
-            ("PLANNING AND JOURNALING", "8:00 AM", "9:00 AM", [
-                ("8:00 AM - 9:00 AM", "Plan the day and journal thoughts")
-            ]),
-            ("WORK SLOT: BUSINESS", "9:00 AM", "12:30 PM", [
-                ("9:00 AM - 12:30 PM", "Focused work on business strategy, research, or other business-related tasks")
-            ]),
-            ("MIDDAY BREAK", "12:30 PM", "1:30 PM", [
-                ("12:30 PM - 1:30 PM", "Lunch and relaxation")
-            ]),
-            ("PERSONAL DEVELOPMENT: READING", "1:30 PM", "3:00 PM", [
-                ("1:30 PM - 3:00 PM", "Reading for personal growth or skill development")
-            ]),
-            ("WORK SLOT: LEARNING", "3:00 PM", "8:00 PM", [
-                ("3:00 PM - 5:30 PM", "Learning courses or skills development"),
-                ("5:45 PM - 8:00 PM", "Focused work on projects or assignments")
-            ]),
-            ("EVENING ROUTINE", "8:00 PM", "11:00 PM", [
-                ("8:00 PM - 9:00 PM", "Networking or community engagement"),
-                ("9:00 PM - 10:00 PM", "Dinner & Relaxation"),
-                ("10:00 PM - 11:00 PM", "Review the day and plan for tomorrow")
-            ])
-        ]
+    # The engine is only touched from the "engine" lane, so edits and regeneration never interleave
 
-        # Populate timetable
-        for segment in timetable:
-            segment_name, start_time_str, end_time_str, tasks = segment
-            for task_time_str, task in tasks:
-                self.add_task(task_time_str, task)
-
-        # Fill remaining slots with dynamic tasks
-        while current_time < end_time:
-            time_str = current_time.strftime("%I:%M %p")
-            if time_str not in self.schedule:
-                if current_time.hour < 8:
-                    task = "Morning Exercise - Start your day with some physical activity!"
-                elif current_time.hour >= 21:
-                    task = f"{self.sleep_schedule} - Time to rest and recharge for tomorrow."
-                else:
-                    task = self.choose_task()
-                self.add_task(time_str, task)
-            current_time += datetime.timedelta(minutes=60)
-
-    def get_advice(self, topic):
-        # Simple advice-generating function
-        advice_list = [
-            f"Focus on consistency when working on {topic}.",
-            f"Break {topic} into smaller, manageable steps.",
-            f"Stay motivated by setting achievable goals for {topic}.",
-            f"Take regular breaks to maintain productivity while working on {topic}."
-        ]
-        return random.choice(advice_list)
-
-    def adjust_task(self, time, new_task):
-        if time in self.schedule:
-            advice = self.get_advice(new_task)
-            self.schedule[time] = f"{new_task} - {advice}"
-            self.refresh_and_generate_schedule()
-        else:
-            messagebox.showerror("Error", "Time slot not found in the schedule.")
+    def set_preference(self, key, value):
+        # Runs on the engine lane, which also saves the preferences
+        self.engine.user_preferences[key] = value
+        self.save_user_preferences()
 
-    def choose_task(self):
-        # Enhanced task recommendation system
-        if not self.task_completion_history:
-            return random.choice(self.daily_tasks)
-
-        # Simulate preference learning
-        preferred_tasks = self.user_preferences.get("preferred_tasks", [])
-        stress_level = self.user_preferences.get("stress_level", "normal")
-
-        # Adjust task selection based on stress level
-        if stress_level == "high":
-            tasks_pool = [task for task in self.daily_tasks if task in self.breaks + ["Meditation", "Relax"]]
-        else:
-            tasks_pool = self.daily_tasks
+    def add_target(self, target, deadline):
+        self.executor.submit(self.engine.add_target, target, deadline, lane="engine")
+        self.store.save_goal("target", target, deadline)
 
-        if preferred_tasks:
-            task = random.choice(preferred_tasks)
-            if task in tasks_pool:
-                return task
+    def add_yearly_task(self, yearly_task, deadline):
+        self.executor.submit(self.engine.add_yearly_task, yearly_task, deadline, lane="engine")
+        self.store.save_goal("yearly", yearly_task, deadline)
 
-        selected_task = random.choice(tasks_pool)
-        return f"{selected_task} - {self.get_advice(selected_task)}"
+    def add_complex_task(self, complex_task, deadline):
+        self.executor.submit(self.engine.add_complex_task, complex_task, deadline, lane="engine")
+        self.store.save_goal("complex", complex_task, deadline)
+
+    def generate_daily_schedule(self, fresh=False):
+        self.engine.generate_daily_schedule(self.fixed_day, fresh=fresh)
+        self.store.save_schedule(self.engine.schedule_day, self.engine.schedule)
+        self.save_archived_goals()
+
+    def save_archived_goals(self):
+        # Expired and completed goals leave the goals table for the archive
+        self.store.archive_goals(self.engine.take_archived())
+
+    def adjust_task(self, time, new_task, on_adjusted=None):
+        # on_adjusted is called on the Tk thread once the engine has found and changed the slot
+        start, end = parse_slot(time)
+
+        def adjust():
+            if not self.engine.adjust_task(start, new_task):
+                return False
+            self.store.save_schedule(self.engine.schedule_day, self.engine.schedule)
+            self.store.set_meta("pinned_slots", self.engine.pins_state())
+            return True
+
+        def adjusted(found):
+            if found:
+                self.refresh_and_generate_schedule()
+                if on_adjusted is not None:
+                    on_adjusted()
+            else:
+                messagebox.showerror("Error", "Time slot not found in the schedule.")
+        self.executor.submit(adjust, lane="engine", on_done=adjusted)
 
     def log_mood(self):
         mood_window = tk.Toplevel()
@@ -216,26 +208,33 @@ class DailyLifeManager:
             if not mood_text.strip():
                 messagebox.showerror("Input Error", "Please enter your mood.")
                 return
-            result = self.sentiment_analyzer(mood_text)[0]
+            threshold = self.engine.user_preferences.get("mood_confidence_threshold", self.mood_scorer.threshold)
+            feedback_label.config(text="Analyzing your mood...")
+            # Scoring may load the sentiment model, so it runs off the Tk thread; pressing Save again replaces it
+            self.executor.submit(self.mood_scorer.score, mood_text, threshold, key="mood", lane="model",
+                                 on_done=mood_scored, on_error=mood_failed)
+
+        def mood_failed(exc):
+            messagebox.showerror("Error", f"Could not score your mood: {exc}")
+
+        def mood_scored(result):
             label = result['label']
             if label == 'NEGATIVE':
-                self.user_preferences["stress_level"] = "high"
+                stress_level = "high"
             elif label == 'POSITIVE':
-                self.user_preferences["stress_level"] = "low"
+                stress_level = "low"
             else:
-                self.user_preferences["stress_level"] = "normal"
-            self.save_user_preferences()
+                stress_level = "normal"
+            # Queued ahead of the regeneration on the same lane, so the new schedule uses it
+            self.executor.submit(self.set_preference, "stress_level", stress_level, lane="engine")
             mood_window.destroy()
-            messagebox.showinfo("Mood Logged", f"Your mood has been logged as {self.user_preferences['stress_level']} stress.")
+            tier = "quick word check" if result['tier'] == "lexicon" else "sentiment model"
+            messagebox.showinfo("Mood Logged", f"Your mood has been logged as {stress_level} stress.\n(Scored by the {tier}, confidence {result['score']:.0%})")
             self.refresh_and_generate_schedule()
 
         save_button = ttk.Button(mood_window, text="Save", command=save_mood, style="Success.TButton")
         save_button.grid(row=1, column=0, columnspan=2, pady=20)
 
-    def display_schedule(self):
-        self.generate_daily_schedule()
-        self.refresh_schedule_display()
-
     def setup_ui(self):
         root = self.root
         root.title("Daily Life Manager")
@@ -253,18 +252,31 @@ class DailyLifeManager:
         # Navigation buttons
         buttons = [
             ("Generate Schedule", self.generate_and_display_schedule),
+            ("Week View", lambda: self.display_range(7)),
+            ("Month View", lambda: self.display_range(30)),
             ("Adjust Task", self.adjust_task_ui),
+            ("Mark Done", lambda: self.record_selected_task(True)),
+            ("Mark Skipped", lambda: self.record_selected_task(False)),
             ("Add Target", self.add_target_ui),
             ("Add Yearly Task", self.add_yearly_task_ui),
             ("Add Complex Task", self.add_complex_task_ui),
             ("Natural Language Input", self.natural_language_input_ui),
-            ("Log Mood", self.log_mood)
+            ("Log Mood", self.log_mood),
+            ("Import Calendar", self.import_calendar_ui),
+            ("Performance", self.performance_ui)
         ]
 
         for idx, (text, command) in enumerate(buttons):
             btn = ttk.Button(nav_frame, text=text, command=command, width=25)
             btn.pack(pady=10, padx=10)
 
+        # Busy indicator, running while background work is pending
+        self.busy_shown = False
+        self.busy_bar = ttk.Progressbar(nav_frame, mode="indeterminate", length=180)
+        self.busy_bar.pack(pady=(20, 5), padx=10)
+        self.busy_label = ttk.Label(nav_frame, text="", font=("Helvetica", 10))
+        self.busy_label.pack(padx=10)
+
         # Welcome and motivational section
         welcome_label = ttk.Label(
             content_frame, text="Welcome to Your Daily Life Manager!", font=("Helvetica", 24, "bold")
@@ -293,31 +305,65 @@ class DailyLifeManager:
         self.schedule_tree.column("Task", width=800, anchor='w')
         self.schedule_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
-        # Add scrollbar to the schedule_tree
-        scrollbar = ttk.Scrollbar(schedule_frame, orient=tk.VERTICAL, command=self.schedule_tree.yview)
+        # Add scrollbar to the schedule_tree; the view drives it because the tree only holds the rows near the visible ones
+        scrollbar = ttk.Scrollbar(schedule_frame, orient=tk.VERTICAL)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.schedule_tree.configure(yscrollcommand=scrollbar.set)
+        self.schedule_view = ScheduleView(self.schedule_tree, visible_rows=20, scrollbar=scrollbar)
+        scrollbar.configure(command=self.schedule_view.yview)
+        self.schedule_tree.configure(yscrollcommand=self.schedule_view.on_tree_scroll)
 
         # Initial Schedule Generation
         self.generate_and_display_schedule()
 
     def generate_and_display_schedule(self):
-        self.generate_daily_schedule()
-        self.refresh_schedule_display()
-
-    def refresh_schedule_display(self):
-        for item in self.schedule_tree.get_children():
-            self.schedule_tree.delete(item)
-
-        # Sort the schedule based on time
-        sorted_schedule = sorted(
-            self.schedule.items(),
-            key=lambda x: datetime.datetime.strptime(x[0].split(" - ")[0], '%I:%M %p')
+        # An explicit request for a new schedule samples every open slot again; pinned edits stay
+        self.refresh_and_generate_schedule(fresh=True)
+
+    @timed("refresh_schedule_display")
+    def refresh_schedule_display(self, slots=None):
+        # slots is a snapshot taken on the engine lane; without one the engine is read directly
+        self.displayed_slots = list(self.engine.schedule) if slots is None else slots
+        day = (self.engine.schedule_day or datetime.date.today()).isoformat()
+
+        # The schedule index is already sorted by start time; rows are keyed by day and start so only changes reach the tree
+        self.schedule_view.set_rows(
+            (f"{day} {slot.start}", (format_slot(slot.start, slot.end), slot.task)) for slot in self.displayed_slots
         )
 
-        # Insert sorted schedule into the treeview
-        for time_str, task in sorted_schedule:
-            self.schedule_tree.insert('', tk.END, values=(time_str, task))
+    def record_selected_task(self, completed):
+        selection = self.schedule_tree.selection()
+        if not selection:
+            messagebox.showerror("Selection Error", "Please select a task in the schedule.")
+            return
+        labels = [self.schedule_tree.item(item, "values")[1] for item in selection]
+
+        def record():
+            for label in labels:
+                task = self.engine.record_outcome(label, completed)
+                self.store.record_task(task, "completed" if completed else "skipped")
+            self.store.set_meta("behavior_stats", self.engine.stats.to_dict())
+            self.store.set_meta("completed_subtasks", self.engine.completed_subtasks())
+            self.save_archived_goals()
+        self.executor.submit(record, lane="engine")
+
+    def display_range(self, days):
+        # Multi-day views are generated in one vectorized pass on the engine lane and only rendered here
+        def generate():
+            calendar = self.engine.generate_range(self.fixed_day or datetime.date.today(), days)
+            self.save_archived_goals()
+            return calendar
+        self.executor.submit(generate, key="schedule", lane="engine", on_done=self.show_range)
+
+    def show_range(self, calendar):
+        rows = []
+        for row in range(calendar.days):
+            day = calendar.date(row)
+            day_label = day.strftime("%a %d %b")
+            rows.extend(
+                (f"{day.isoformat()} {slot.start}", (f"{day_label}  {format_slot(slot.start, slot.end)}", slot.task))
+                for slot in calendar.day_slots(row)
+            )
+        self.schedule_view.set_rows(rows, keep_position=False)
 
     def adjust_task_ui(self):
         adjust_window = tk.Toplevel()
@@ -331,7 +377,7 @@ class DailyLifeManager:
         form_frame.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
 
         ttk.Label(form_frame, text="Select Time:", font=("Helvetica", 12)).grid(row=0, column=0, padx=5, pady=5, sticky='e')
-        time_combobox = ttk.Combobox(form_frame, values=sorted(self.schedule.keys()), state="readonly", width=25)
+        time_combobox = ttk.Combobox(form_frame, values=[format_slot(slot.start, slot.end) for slot in self.displayed_slots], state="readonly", width=25)
         time_combobox.grid(row=0, column=1, padx=5, pady=5)
 
         ttk.Label(form_frame, text="New Task:", font=("Helvetica", 12)).grid(row=1, column=0, padx=5, pady=5, sticky='e')
@@ -345,10 +391,9 @@ class DailyLifeManager:
                 messagebox.showerror("Input Error", "Please select a time and enter a new task.")
                 return
             try:
-                datetime.datetime.strptime(time.split(" - ")[0], '%I:%M %p')
-                self.adjust_task(time, new_task)
+                self.adjust_task(time, new_task,
+                                 on_adjusted=lambda: messagebox.showinfo("Task Adjusted", f"Task at {time} has been adjusted."))
                 adjust_window.destroy()
-                messagebox.showinfo("Task Adjusted", f"Task at {time} has been adjusted.")
             except ValueError:
                 messagebox.showerror("Invalid Time", "Please select a valid time slot.")
 
@@ -463,6 +508,58 @@ class DailyLifeManager:
         save_button = ttk.Button(complex_task_window, text="Save", command=save_complex_task, style="Success.TButton")
         save_button.pack(pady=20)
 
+    def performance_ui(self):
+        perf_window = tk.Toplevel()
+        perf_window.title("Performance")
+        perf_window.geometry("760x420")
+
+        ttk.Label(perf_window, text="Performance", font=("Helvetica", 16, "bold")).pack(pady=10)
+
+        enabled = tk.BooleanVar(value=METRICS.enabled)
+
+        def toggle():
+            METRICS.enabled = enabled.get()
+            self.executor.submit(self.set_preference, "metrics_enabled", METRICS.enabled, lane="engine")
+
+        ttk.Checkbutton(perf_window, text="Record timings", variable=enabled, command=toggle).pack(pady=5)
+
+        columns = ("Metric", "Count", "p50 (ms)", "p95 (ms)", "p99 (ms)", "Max (ms)")
+        metrics_tree = ttk.Treeview(perf_window, columns=columns, show='headings', height=12)
+        for column in columns:
+            metrics_tree.heading(column, text=column)
+            metrics_tree.column(column, width=220 if column == "Metric" else 100, anchor='w' if column == "Metric" else 'e')
+        metrics_tree.pack(padx=10, pady=5, fill=tk.BOTH, expand=True)
+        view = ScheduleView(metrics_tree, visible_rows=12)
+
+        def refresh():
+            if not perf_window.winfo_exists():
+                return
+            snapshot = METRICS.snapshot()
+            rows = [
+                (name, (name, h["count"], f"{h['p50'] * 1000:.2f}", f"{h['p95'] * 1000:.2f}", f"{h['p99'] * 1000:.2f}", f"{h['max'] * 1000:.2f}"))
+                for name, h in sorted(snapshot["histograms"].items())
+            ]
+            rows.extend((name, (name, value, "", "", "", "")) for name, value in sorted(snapshot["counters"].items()))
+            view.set_rows(rows)
+            perf_window.after(1000, refresh)
+
+        def export():
+            path = filedialog.asksaveasfilename(
+                title="Export Metrics", defaultextension=".prom",
+                filetypes=[("Prometheus text", "*.prom"), ("JSON", "*.json"), ("All files", "*.*")]
+            )
+            if path:
+                try:
+                    METRICS.write(path)
+                except OSError as e:
+                    messagebox.showerror("Export Error", f"Could not write {path}: {e}")
+
+        button_frame = ttk.Frame(perf_window)
+        button_frame.pack(pady=10)
+        ttk.Button(button_frame, text="Reset", command=METRICS.reset).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Export...", command=export).pack(side=tk.LEFT, padx=5)
+        refresh()
+
     def natural_language_input_ui(self):
         nl_window = tk.Toplevel()
         nl_window.title("Natural Language Input")
@@ -479,109 +576,159 @@ class DailyLifeManager:
         command_entry.grid(row=0, column=1, padx=5, pady=5)
 
         process_button = ttk.Button(form_frame, text="Process", command=lambda: self.process_nlp_command(command_entry, output_text), style="Primary.TButton")
-        process_button.grid(row=1, column=0, columnspan=2, pady=10)
+        process_button.grid(row=1, column=0, pady=10)
+
+        import_button = ttk.Button(form_frame, text="Import File...", command=lambda: self.import_commands_ui(output_text))
+        import_button.grid(row=1, column=1, pady=10)
 
         ttk.Label(form_frame, text="Output:", font=("Helvetica", 12)).grid(row=2, column=0, padx=5, pady=5, sticky='ne')
         output_text = tk.Text(form_frame, height=5, width=40, state='disabled', wrap='word', font=("Helvetica", 12))
         output_text.grid(row=2, column=1, padx=5, pady=5)
 
+    def apply_command(self, command):
+        # Apply a parsed command to the engine and save it; returns the command as applied, or None if it was not understood
+        command = self.engine.apply_command(command)
+        if command is None:
+            return None
+        if command.action == "task":
+            self.store.add_task(command.name)
+        else:
+            self.store.save_goal(command.action, command.name, command.deadline)
+        return command
+
+    def import_commands(self, lines):
+        # Apply many commands and regenerate the schedule once at the end.
+        # Returns (applied, failed, first_error) where first_error is (line_no, feedback) or None.
+        applied, failed, first_error = 0, 0, None
+        for line_no, command in iter_commands(lines):
+            if self.apply_command(command):
+                applied += 1
+            else:
+                failed += 1
+                first_error = first_error or (line_no, command.feedback)
+        if applied:
+            self.refresh_and_generate_schedule()
+        return applied, failed, first_error
+
+    def import_commands_ui(self, output_text):
+        path = filedialog.askopenfilename(title="Import Commands", filetypes=[("Text files", "*.txt"), ("All files", "*.*")])
+        if not path:
+            return
+
+        def import_file():
+            with open(path, encoding="utf-8") as f:
+                return self.import_commands(f)
+
+        def imported(counts):
+            applied, failed, first_error = counts
+            feedback = f"Applied {applied} commands."
+            if failed:
+                feedback += f" {failed} lines were not understood, e.g. line {first_error[0]}: {first_error[1]}"
+            self.show_feedback(output_text, feedback)
+        self.show_feedback(output_text, "Importing...")
+        self.executor.submit(import_file, lane="engine", on_done=imported)
+
+    def import_calendar_ui(self):
+        path = filedialog.askopenfilename(
+            title="Import Calendar", filetypes=[("Calendar files", "*.ics *.csv"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+
+        def import_file():
+            # Streams the file into the store; re-importing the same file replaces its blocks
+            counts = {}
+            imported = self.store.import_busy(read_busy_file(path, counts=counts), os.path.basename(path))
+            return imported, counts["skipped"]
+
+        def imported(result):
+            count, skipped = result
+            message = f"Marked {count} busy blocks from {os.path.basename(path)}."
+            if skipped:
+                message += f"\n{skipped} events could not be read and were skipped."
+            messagebox.showinfo("Calendar Imported", message)
+            self.refresh_and_generate_schedule()
+        self.executor.submit(import_file, lane="engine", on_done=imported)
+
     def process_nlp_command(self, command_entry, output_text):
-        command = command_entry.get().strip()
-        if not command:
+        text = command_entry.get().strip()
+        if not text:
             messagebox.showerror("Input Error", "Please enter a command.")
             return
 
-        # Use NLP model to parse the command
-        # For simplicity, we'll use simple keyword-based parsing enhanced by the model
-        feedback = ""
-        if "add task" in command.lower():
-            task = command.lower().replace("add task", "").strip()
-            if task:
-                self.daily_tasks.append(task.capitalize())
-                feedback = f"Task '{task.capitalize()}' has been added to your daily tasks."
-                self.refresh_and_generate_schedule()
-            else:
-                feedback = "No task specified to add."
-        elif "add target" in command.lower():
-            parts = command.lower().split("add target")
-            if len(parts) > 1:
-                target_info = parts[1].strip().split(" by ")
-                if len(target_info) == 2:
-                    target, deadline = target_info
-                    try:
-                        datetime.datetime.strptime(deadline.strip(), '%Y-%m-%d')
-                        self.add_target(target.strip().capitalize(), deadline.strip())
-                        feedback = f"Target '{target.strip().capitalize()}' added with deadline {deadline.strip()}."
-                        self.refresh_and_generate_schedule()
-                    except ValueError:
-                        feedback = "Invalid date format. Use YYYY-MM-DD."
-                else:
-                    feedback = "Please specify target and deadline using 'by'. Example: Add target Finish report by 2024-12-31."
-            else:
-                feedback = "Invalid command format."
-        elif "add yearly task" in command.lower():
-            parts = command.lower().split("add yearly task")
-            if len(parts) > 1:
-                task_info = parts[1].strip().split(" by ")
-                if len(task_info) == 2:
-                    task, deadline = task_info
-                    try:
-                        datetime.datetime.strptime(deadline.strip(), '%Y-%m-%d')
-                        self.add_yearly_task(task.strip().capitalize(), deadline.strip())
-                        feedback = f"Yearly task '{task.strip().capitalize()}' added with deadline {deadline.strip()}."
-                        self.refresh_and_generate_schedule()
-                    except ValueError:
-                        feedback = "Invalid date format. Use YYYY-MM-DD."
-                else:
-                    feedback = "Please specify yearly task and deadline using 'by'. Example: Add yearly task Complete certification by 2025-06-30."
-            else:
-                feedback = "Invalid command format."
-        elif "add complex task" in command.lower():
-            parts = command.lower().split("add complex task")
-            if len(parts) > 1:
-                task_info = parts[1].strip().split(" by ")
-                if len(task_info) == 2:
-                    task, deadline = task_info
-                    try:
-                        datetime.datetime.strptime(deadline.strip(), '%Y-%m-%d')
-                        self.add_complex_task(task.strip().capitalize(), deadline.strip())
-                        feedback = f"Complex task '{task.strip().capitalize()}' added with deadline {deadline.strip()}."
-                        self.refresh_and_generate_schedule()
-                    except ValueError:
-                        feedback = "Invalid date format. Use YYYY-MM-DD."
-                else:
-                    feedback = "Please specify complex task and deadline using 'by'. Example: Add complex task Launch project by 2024-11-15."
-            else:
-                feedback = "Invalid command format."
-        else:
-            feedback = "Command not recognized. Try 'add task [task name]', 'add target [target] by [YYYY-MM-DD]', 'add yearly task [task] by [YYYY-MM-DD]', or 'add complex task [task] by [YYYY-MM-DD]'."
+        started = time.perf_counter()
+        command = parse_command(text)
+        parse_seconds = time.perf_counter() - started
+        if command.action is not None:
+            # Feedback changes if the task turns out to match one already in the catalog
+            self.executor.submit(self.run_command, command, parse_seconds, lane="engine",
+                                 on_done=lambda applied: self.show_feedback(output_text, applied.feedback))
+            self.refresh_and_generate_schedule()
+        self.show_feedback(output_text, command.feedback)
 
+        # Clear the command entry
+        command_entry.delete(0, tk.END)
+
+    def run_command(self, command, parse_seconds=0.0):
+        # Runs on the engine lane. The process_nlp_command metric is parsing plus applying, without the
+        # time spent queued; the regeneration that follows is coalesced and timed on its own.
+        started = time.perf_counter()
+        try:
+            return self.apply_command(command)
+        finally:
+            METRICS.observe("process_nlp_command", parse_seconds + time.perf_counter() - started)
+
+    def show_feedback(self, output_text, feedback):
         # Display feedback
         output_text.config(state='normal')
         output_text.delete(1.0, tk.END)
         output_text.insert(tk.END, feedback)
         output_text.config(state='disabled')
 
-        # Clear the command entry
-        command_entry.delete(0, tk.END)
-
     def start_notification_thread(self):
-        notification_thread = threading.Thread(target=self.notification_loop, daemon=True)
-        notification_thread.start()
-
-    def notification_loop(self):
-        while True:
-            now = datetime.datetime.now().strftime("%I:%M %p")
-            if now in self.schedule:
-                task_info = self.schedule[now]
-                # Show notification (use a separate thread to avoid blocking)
-                threading.Thread(target=lambda: messagebox.showinfo("Task Reminder", f"It's time for: {task_info}"), daemon=True).start()
-            time.sleep(60)  # Check every minute
+        self.reminders.start()
+        # Regenerate the schedule when a new day starts
+        tomorrow = datetime.date.today() + datetime.timedelta(days=1)
+        self.reminders.add(datetime.datetime.combine(tomorrow, datetime.time()), "New day", repeat=datetime.timedelta(days=1), group="day_rollover")
+
+    def sync_reminders(self):
+        # Replace today's reminders whenever the schedule changes; the scheduler thread wakes up on its own
+        day = self.engine.schedule_day or datetime.date.today()
+        midnight = datetime.datetime.combine(day, datetime.time())
+        now = datetime.datetime.now()
+        lead = datetime.timedelta(minutes=self.engine.user_preferences.get("reminder_lead_minutes", 5))
+        items = []
+        for slot in self.engine.schedule:
+            start = midnight + datetime.timedelta(minutes=slot.start)
+            if lead and start - lead > now:
+                items.append((start - lead, f"Coming up at {format_minute(slot.start)}: {slot.task}"))
+            if start > now:
+                items.append((start, f"It's time for: {slot.task}"))
+        self.reminders.replace_group("schedule", items)
+
+    def show_reminder(self, reminder):
+        if reminder.group == "day_rollover":
+            self.refresh_and_generate_schedule()
+        else:
+            messagebox.showinfo("Task Reminder", reminder.message)
 
     # Ensure the schedule refreshes and regenerates after adjustments
-    def refresh_and_generate_schedule(self):
-        self.generate_daily_schedule()
-        self.refresh_schedule_display()
+    def refresh_and_generate_schedule(self, fresh=False):
+        # A newer regeneration (or range view) replaces one that has not finished yet
+        self.executor.submit(self.generate_schedule_snapshot, fresh, key="schedule", lane="engine", on_done=self.refresh_schedule_display)
+
+    def generate_schedule_snapshot(self, fresh=False):
+        # Runs on the engine lane; the copy is what the Tk thread renders
+        self.generate_daily_schedule(fresh)
+        self.sync_reminders()
+        return list(self.engine.schedule)
+
+    def on_close(self):
+        self.executor.shutdown(timeout=2)
+        self.reminders.stop(timeout=1)
+        self.sentiment.close(timeout=1)
+        self.store.close()
+        self.root.destroy()
 
     def run(self):
         self.root.mainloop()
@@ -0,0 +1,57 @@
+import heapq
+import itertools
+
+from goal_planner import to_ordinal
+
+# Min-heap of goal deadlines. Expired goals are popped in deadline order in
+# O(log n) each; replaced or discarded goals leave stale entries behind that are
+# skipped when they surface, and the heap is rebuilt once they outnumber live ones.
+
+
+class ExpiryIndex:
+    def __init__(self):
+        self._heap = []  # (deadline ordinal, seq, goal key)
+        self._live = {}  # goal key -> (deadline ordinal, seq) of its current entry
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self._live)
+
+    def __contains__(self, goal_key):
+        return goal_key in self._live
+
+    def add(self, goal_key, deadline):
+        # Adding a goal again replaces its deadline
+        entry = (to_ordinal(deadline), next(self._seq))
+        self._live[goal_key] = entry
+        heapq.heappush(self._heap, entry + (goal_key,))
+        self._compact()
+
+    def discard(self, goal_key):
+        return self._live.pop(goal_key, None) is not None
+
+    def next_deadline(self):
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_expired(self, day):
+        # [(goal key, deadline ordinal)] of goals whose deadline is before day, earliest first
+        day = to_ordinal(day)
+        expired = []
+        while True:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] >= day:
+                return expired
+            deadline, seq, goal_key = heapq.heappop(self._heap)
+            del self._live[goal_key]
+            expired.append((goal_key, deadline))
+
+    def _drop_stale(self):
+        heap = self._heap
+        while heap and self._live.get(heap[0][2]) != heap[0][:2]:
+            heapq.heappop(heap)
+
+    def _compact(self):
+        if len(self._heap) > 2 * len(self._live) + 64:
+            self._heap = [entry + (goal_key,) for goal_key, entry in self._live.items()]
+            heapq.heapify(self._heap)
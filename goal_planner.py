@@ -0,0 +1,309 @@
+import bisect
+import datetime
+import heapq
+import itertools
+from collections import namedtuple
+
+# Goals are broken into steps that form a DAG (by default a chain). The planner
+# assigns step work to days with earliest-deadline-first under a daily capacity
+# and re-plans only from the first day a changed goal can affect.
+
+Goal = namedtuple("Goal", ["name", "kind", "start", "deadline", "steps"])
+Step = namedtuple("Step", ["key", "goal", "name", "duration", "due", "after"])
+
+# Goals are keyed by (kind, name) and steps by (goal key, step index)
+
+# kind -> (number of steps, step label, minutes per step)
+GOAL_STEPS = {
+    "target": (5, "Step", 60),
+    "yearly": (12, "Month", 120),
+    "complex": (4, "Week", 90),
+}
+
+
+def to_ordinal(value):
+    if isinstance(value, str):
+        value = datetime.datetime.strptime(value, '%Y-%m-%d').date()
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    if isinstance(value, datetime.date):
+        return value.toordinal()
+    return int(value)
+
+
+class GoalPlanner:
+    def __init__(self, start=None, capacity=120, horizon_days=366):
+        self.start = to_ordinal(start or datetime.date.today())
+        self.capacity = capacity  # Minutes of goal work per day, or a function of the date
+        self.horizon_days = horizon_days
+        self.goals = {}
+        self._steps = {}
+        self._successors = {}
+        self._order = {}
+        self._seq = itertools.count()
+        self._done = {}  # Minutes of each step completed before self.start
+        self._days = {}  # ordinal -> [(step key, minutes)]
+        self._allocations = {}  # step key -> [(ordinal, minutes)] in day order
+        self._finished = {}  # step key -> ordinal the step is completed on
+        self._dirty_from = self.start
+        # Days are only simulated as far as someone asks; the EDF state at that point is kept to resume from
+        self._planned_until = self.start
+        self._remaining, self._pending, self._ready = {}, {}, []
+        # EDF state at self.start, kept up to date as goals come and go so re-planning from the start is a copy
+        self._base = None
+
+    # Goals
+
+    def default_steps(self, name, kind):
+        count, label, minutes = GOAL_STEPS[kind]
+        return [(f"{name} - {label} {i + 1}", minutes, [i - 1] if i else []) for i in range(count)]
+
+    def _build_goal(self, name, kind, deadline, steps, start):
+        deadline = to_ordinal(deadline)
+        start = min(to_ordinal(start) if start is not None else self.start, deadline)
+        steps = steps if steps is not None else self.default_steps(name, kind)
+        span = deadline - start
+        goal_key = (kind, name)
+        built = []
+        for index, (step_name, duration, after) in enumerate(steps):
+            # Intermediate steps get evenly spaced due dates up to the goal deadline
+            due = start + (span * (index + 1)) // len(steps)
+            built.append(Step((goal_key, index), goal_key, step_name, duration, due, tuple((goal_key, a) for a in after)))
+        return Goal(name, kind, start, deadline, built)
+
+    def add_goal(self, name, kind, deadline, steps=None, start=None):
+        # steps: [(name, minutes, [indices of steps it depends on])]; defaults to a chain for the kind
+        goal = self._build_goal(name, kind, deadline, steps, start)
+        affected = self._first_affected_day(goal)
+        if (kind, name) in self.goals:
+            affected = min(affected, self._remove((kind, name)))
+        self.goals[(kind, name)] = goal
+        for step in goal.steps:
+            self._steps[step.key] = step
+            self._order[step.key] = next(self._seq)
+            self._successors.setdefault(step.key, [])
+            for dep in step.after:
+                self._successors.setdefault(dep, []).append(step.key)
+        self._add_steps((self._remaining, self._pending, self._ready), goal.steps)
+        if self._base is not None:
+            self._add_steps(self._base, goal.steps)
+        self._mark_dirty(affected)
+        return goal
+
+    def remove_goal(self, name, kind):
+        if (kind, name) not in self.goals:
+            return False
+        self._mark_dirty(self._remove((kind, name)))
+        return True
+
+    def _remove(self, goal_key):
+        # Drop a goal's steps; returns the first day its work was planned on
+        goal = self.goals.pop(goal_key)
+        # A goal without allocations did not shape any simulated day
+        first_day = self._planned_until
+        for step in goal.steps:
+            allocations = self._allocations.pop(step.key, [])
+            if allocations:
+                first_day = min(first_day, allocations[0][0])
+            for day, minutes in allocations:
+                self._days[day] = [entry for entry in self._days[day] if entry[0] != step.key]
+            self._steps.pop(step.key, None)
+            self._order.pop(step.key, None)
+            self._successors.pop(step.key, None)
+            self._finished.pop(step.key, None)
+            self._done.pop(step.key, None)
+            # Heap entries of removed or re-added steps no longer match _order and are skipped when they surface
+            self._remaining.pop(step.key, None)
+            self._pending.pop(step.key, None)
+            if self._base is not None:
+                self._base[0].pop(step.key, None)
+                self._base[1].pop(step.key, None)
+            for dep in step.after:
+                if dep in self._successors:
+                    self._successors[dep] = [key for key in self._successors[dep] if key != step.key]
+        return max(first_day, self.start)
+
+    def complete_step(self, goal_key, index):
+        # Count a step as done, e.g. when it is finished ahead of the plan; later days are planned without it
+        key = (goal_key, index)
+        step = self._steps.get(key)
+        if step is None or self._done.get(key, 0) >= step.duration:
+            return False
+        allocations = self._allocations.get(key)
+        first_day = allocations[0][0] if allocations else self._planned_until
+        self._done[key] = step.duration
+        self._base = None
+        # Unlike other changes this always resets, because the live EDF state still holds the step's minutes
+        first_day = max(first_day, self.start)
+        self._dirty_from = first_day if self._dirty_from is None else min(self._dirty_from, first_day)
+        return True
+
+    def set_capacity(self, capacity):
+        # Days already simulated are planned again with the new daily minutes
+        if capacity != self.capacity:
+            self.capacity = capacity
+            self._mark_dirty(self.start)
+
+    def _first_affected_day(self, goal):
+        # Days before the first one with spare capacity or lower-priority work stay as planned
+        ready_due = min((step.due for step in goal.steps if not step.after), default=None)
+        if ready_due is None or self._dirty_from is not None:
+            return self.start
+        for day in range(self.start, self._planned_until):
+            entries = self._days.get(day, [])
+            if sum(minutes for key, minutes in entries) < self._capacity(day):
+                return day
+            if any(self._steps[key].due > ready_due for key, minutes in entries):
+                return day
+        return self._planned_until
+
+    def _mark_dirty(self, day):
+        # Only simulated days can go stale; past them the live EDF state is updated in place
+        if day >= self._planned_until and self._dirty_from is None:
+            self._planned_until = max(self._planned_until, self.start)
+            return
+        day = max(day, self.start)
+        self._dirty_from = day if self._dirty_from is None else min(self._dirty_from, day)
+
+    # Planning
+
+    def _capacity(self, day):
+        if callable(self.capacity):
+            return self.capacity(datetime.date.fromordinal(day))
+        return self.capacity
+
+    def _horizon_end(self):
+        last_deadline = max((goal.deadline for goal in self.goals.values()), default=self.start)
+        return max(self.start + self.horizon_days, last_deadline + 1)
+
+    def _add_steps(self, state, steps):
+        # Bring newly added steps into an EDF state (remaining, pending, ready)
+        remaining, pending, ready = state
+        for step in steps:
+            remaining[step.key] = step.duration - self._done.get(step.key, 0)
+        for step in steps:
+            if remaining[step.key] <= 0:
+                continue
+            pending[step.key] = sum(1 for dep in step.after if remaining.get(dep, 0) > 0)
+            if not pending[step.key]:
+                heapq.heappush(ready, (step.due, self._order[step.key], step.key))
+
+    def _base_state(self):
+        if self._base is None or len(self._base[2]) > 2 * len(self._base[0]) + 64:
+            self._base = ({}, {}, [])
+            self._add_steps(self._base, list(self._steps.values()))
+        return self._base
+
+    def _reset(self, from_day):
+        # Forget everything planned from from_day on and rebuild the EDF state at its start
+        if from_day <= self.start:
+            remaining, pending, ready = self._base_state()
+            self._days.clear()
+            self._allocations = {}
+            self._finished = {key: day for key, day in self._finished.items() if day < from_day}
+            self._remaining, self._pending, self._ready = dict(remaining), dict(pending), list(ready)
+            self._planned_until = from_day
+            return
+        for day in [day for day in self._days if day >= from_day]:
+            del self._days[day]
+        remaining, pending, ready = {}, {}, []
+        for key, step in self._steps.items():
+            allocations = self._allocations.get(key)
+            planned = 0
+            if allocations:
+                cut = bisect.bisect_left(allocations, (from_day,))
+                del allocations[cut:]
+                planned = sum(m for d, m in allocations)
+            remaining[key] = step.duration - self._done.get(key, 0) - planned
+            if remaining[key] > 0:
+                self._finished.pop(key, None)
+        for key, step in self._steps.items():
+            if remaining[key] <= 0:
+                continue
+            pending[key] = sum(1 for dep in step.after if remaining.get(dep, 0) > 0)
+            if not pending[key]:
+                heapq.heappush(ready, (step.due, self._order[key], key))
+        self._remaining, self._pending, self._ready = remaining, pending, ready
+        self._planned_until = from_day
+
+    def _plan(self, until=None):
+        if self._dirty_from is not None:
+            self._reset(self._dirty_from)
+            self._dirty_from = None
+        end = self._horizon_end()
+        until = end if until is None else min(until, end)
+        remaining, pending, ready = self._remaining, self._pending, self._ready
+
+        for day in range(self._planned_until, until):
+            if not ready:
+                break
+            capacity = self._capacity(day)
+            entries = []
+            while capacity > 0 and ready:
+                due, order, key = ready[0]
+                if order != self._order.get(key):
+                    heapq.heappop(ready)
+                    continue
+                take = min(capacity, remaining[key])
+                entries.append((key, take))
+                self._allocations.setdefault(key, []).append((day, take))
+                capacity -= take
+                remaining[key] -= take
+                if remaining[key] > 0:
+                    break
+                heapq.heappop(ready)
+                self._finished[key] = day
+                for successor in self._successors.get(key, []):
+                    if successor not in pending:
+                        continue  # Completed ahead of this step
+                    pending[successor] -= 1
+                    if not pending[successor]:
+                        step = self._steps[successor]
+                        heapq.heappush(ready, (step.due, self._order[successor], successor))
+            if entries:
+                self._days[day] = entries
+        self._planned_until = max(self._planned_until, until)
+
+    def advance(self, day):
+        # Move the plan start forward, treating work planned before it as done
+        day = to_ordinal(day)
+        if day <= self.start:
+            return
+        self._plan(day)
+        for key, allocations in self._allocations.items():
+            cut = bisect.bisect_left(allocations, (day,))
+            self._done[key] = self._done.get(key, 0) + sum(m for d, m in allocations[:cut])
+            del allocations[:cut]
+        for old_day in [d for d in self._days if d < day]:
+            del self._days[old_day]
+        self.start = day
+        self._base = None
+        self._mark_dirty(day)
+
+    def allocations_on(self, day):
+        # [(Step, minutes)] of goal work planned for one day, most urgent first
+        day = to_ordinal(day)
+        self._plan(day + 1)
+        return [(self._steps[key], minutes) for key, minutes in self._days.get(day, [])]
+
+    def plan_range(self, start, end):
+        start, end = to_ordinal(start), to_ordinal(end)
+        self._plan(end)
+        return {
+            datetime.date.fromordinal(day): [(self._steps[key], minutes) for key, minutes in self._days[day]]
+            for day in sorted(self._days) if start <= day < end
+        }
+
+    def finish_date(self, step_key):
+        self._plan()
+        day = self._finished.get(step_key)
+        return datetime.date.fromordinal(day) if day is not None else None
+
+    def late_steps(self):
+        # Steps that finish after their due date or do not fit in the horizon at all
+        self._plan()
+        return [
+            step for key, step in self._steps.items()
+            if self._done.get(key, 0) < step.duration
+            and (self._finished.get(key) is None or self._finished[key] > step.due)
+        ]
@@ -0,0 +1,163 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from sentiment_service import _percentile
+
+# Load test for api_server.py on localhost. Every client keeps one connection open and
+# sends a mix of schedule, command, mood, goal and outcome requests as its own user.
+#
+#   python load_test.py --start-server --clients 50 --requests 200
+#   python load_test.py --port 8765 --clients 200 --users 50    # against a running server
+
+MOODS = ["I feel great today", "exhausted and stressed", "a bit tired but okay", "happy and calm", "meh"]
+
+# (weight, method, path suffix, body factory)
+MIX = [
+    (50, "GET", "schedule", None),
+    (15, "POST", "commands", lambda rng, n: {"text": f"add task Practice {rng.randrange(50)}"}),
+    (15, "POST", "mood", lambda rng, n: {"text": rng.choice(MOODS)}),
+    (5, "POST", "goals", lambda rng, n: {"kind": "target", "name": f"Goal {n}", "deadline": "2099-12-31"}),
+    (5, "GET", "goals", None),
+    (10, "POST", "outcomes", lambda rng, n: {"task": "Reading", "completed": rng.random() < 0.7}),
+]
+
+
+class Connection:
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n\r\n".encode("latin-1") + data
+        )
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        payload = json.loads(await self.reader.readexactly(int(headers.get("content-length", 0))))
+        if headers.get("connection", "").lower() == "close":
+            self.close()
+        return status, payload
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+async def client(index, args, results):
+    rng = random.Random(args.seed + index)
+    user = f"user{index % args.users}"
+    weights = [weight for weight, method, suffix, body in MIX]
+    connection = Connection(args.host, args.port)
+    try:
+        for n in range(args.requests):
+            weight, method, suffix, body = rng.choices(MIX, weights)[0]
+            started = time.perf_counter()
+            try:
+                status, payload = await connection.request(method, f"/users/{user}/{suffix}", body and body(rng, n))
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+                status = f"{type(e).__name__}"
+                connection.close()
+            results.setdefault(suffix, []).append((time.perf_counter() - started, status))
+    finally:
+        connection.close()
+
+
+async def wait_for_server(host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def run(args):
+    await wait_for_server(args.host, args.port)
+    results = {}
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i, args, results) for i in range(args.clients)))
+    elapsed = time.perf_counter() - started
+    stats_connection = Connection(args.host, args.port)
+    status, stats = await stats_connection.request("GET", "/stats")
+    stats_connection.close()
+    return results, elapsed, stats
+
+
+def report(results, elapsed, stats):
+    total = sum(len(samples) for samples in results.values())
+    print(f"{total} requests in {elapsed:.2f} s: {total / elapsed:.0f} requests/s")
+    print(f"{'endpoint':<12} {'count':>7} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    everything = []
+    for suffix, samples in sorted(results.items()):
+        latencies = sorted(seconds for seconds, status in samples)
+        everything.extend(latencies)
+        errors = sum(1 for seconds, status in samples if status not in (200, 201))
+        print(f"{suffix:<12} {len(samples):>7} {errors:>7} {_percentile(latencies, 50) * 1000:>9.2f} "
+              f"{_percentile(latencies, 95) * 1000:>9.2f} {_percentile(latencies, 99) * 1000:>9.2f}")
+    everything.sort()
+    print(f"{'all':<12} {total:>7} {'':>7} {_percentile(everything, 50) * 1000:>9.2f} "
+          f"{_percentile(everything, 95) * 1000:>9.2f} {_percentile(everything, 99) * 1000:>9.2f}")
+    sentiment = stats.get("sentiment")
+    if sentiment:
+        print(f"sentiment: {sentiment['batches']} batches, mean size {sentiment['mean_batch_size']:.1f}")
+    print(f"mood answered by tier: {stats['mood']['answered']}")
+    return sum(1 for samples in results.values() for seconds, status in samples if status not in (200, 201))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the API server on localhost.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, default=50, help="concurrent keep-alive connections")
+    parser.add_argument("--users", type=int, default=20, help="distinct users the clients act as")
+    parser.add_argument("--requests", type=int, default=100, help="requests per client")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start-server", action="store_true",
+                        help="start api_server.py on --port with a temporary data directory for the run")
+    parser.add_argument("--model", action="store_true", help="with --start-server, let moods reach the sentiment model")
+    args = parser.parse_args(argv)
+
+    server = None
+    with tempfile.TemporaryDirectory() as data_dir:
+        if args.start_server:
+            command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "api_server.py"),
+                       "--host", args.host, "--port", str(args.port), "--data-dir", data_dir,
+                       "--max-users", str(max(args.users, 1))]
+            if not args.model:
+                command.append("--lexicon-only")
+            server = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+        try:
+            errors = report(*asyncio.run(run(args)))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
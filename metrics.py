@@ -0,0 +1,159 @@
+import bisect
+import contextlib
+import functools
+import json
+import os
+import re
+import threading
+import time
+
+# Timing histograms and counters for the hot paths. Histograms use fixed
+# log-spaced buckets, so memory is constant and p50/p95/p99 are estimated by
+# interpolating inside a bucket. When disabled, hooks cost one attribute check.
+#
+#   DAILY_LIFE_METRICS=1 python daily_life_manager.py     # start with metrics on
+
+# Bucket upper bounds in seconds: 1 us doubling up to about 134 s
+BUCKETS = tuple(1e-6 * 2 ** i for i in range(28))
+
+_NULL_TIMER = contextlib.nullcontext()
+
+
+class Histogram:
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # The last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lo = self.bounds[i - 1] if i else 0.0
+                hi = self.bounds[i] if i < len(self.bounds) else self.max
+                return min(lo + (hi - lo) * (rank - seen) / count, self.max)
+            seen += count
+        return self.max
+
+
+class _Timer:
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    def __init__(self, enabled=False, prefix="daily_life"):
+        self.enabled = enabled
+        self.prefix = prefix  # Prepended to exported metric names
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def observe(self, name, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    def increment(self, name, amount=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def timer(self, name):
+        # with metrics.timer("name"): ...
+        return _Timer(self, name) if self.enabled else _NULL_TIMER
+
+    def timed(self, name):
+        # Decorator recording each call's duration under name
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - start)
+            return wrapper
+        return decorate
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self):
+        with self._lock:
+            histograms = {
+                name: {
+                    "count": h.count, "sum": h.sum, "max": h.max,
+                    "p50": h.quantile(0.50), "p95": h.quantile(0.95), "p99": h.quantile(0.99),
+                }
+                for name, h in self._histograms.items()
+            }
+            return {"enabled": self.enabled, "histograms": histograms, "counters": dict(self._counters)}
+
+    def _name(self, name):
+        return re.sub(r"[^a-zA-Z0-9_]", "_", f"{self.prefix}_{name}")
+
+    def to_prometheus(self):
+        lines = []
+        with self._lock:
+            for name, h in sorted(self._histograms.items()):
+                metric = self._name(name) + "_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, count in zip(h.bounds, h.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{le="{bound:.9g}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{le="+Inf"}} {h.count}')
+                lines.append(f"{metric}_sum {h.sum:.9g}")
+                lines.append(f"{metric}_count {h.count}")
+            for name, value in sorted(self._counters.items()):
+                metric = self._name(name) + "_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        # JSON for *.json, Prometheus text otherwise; replaced atomically so a scraper never sees half a file
+        if path.endswith(".json"):
+            text = json.dumps(self.snapshot(), indent=2)
+        else:
+            text = self.to_prometheus()
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(temp_path, path)
+
+
+# Shared by every module so one switch turns all hooks on or off
+METRICS = Metrics(enabled=os.environ.get("DAILY_LIFE_METRICS", "") not in ("", "0"))
+timed = METRICS.timed
@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+
+
+def load_pipeline(task, model=None):
+    # Import transformers here so that merely importing the app stays cheap
+    from transformers import pipeline
+    if model:
+        return pipeline(task, model=model)
+    return pipeline(task)
+
+
+def load_shared_pipeline(directory, task):
+    # Weights exported by shared_weights.py are memory-mapped, so processes on one host share one copy
+    from shared_weights import load_mapped_pipeline
+    return load_mapped_pipeline(directory, task)
+
+
+class ModelRegistry:
+    def __init__(self, idle_timeout=15 * 60, shared_dir=None):
+        self.idle_timeout = idle_timeout  # Seconds a model may sit unused before it can be unloaded
+        self.shared_dir = shared_dir  # Directory with pipelines exported by shared_weights.py, one subdirectory per name
+        self.load_timings = {}  # Seconds spent loading each model
+        self._factories = {}
+        self._models = {}
+        self._last_used = {}
+        self._load_locks = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, factory):
+        with self._lock:
+            self._factories[name] = factory
+            self._load_locks.setdefault(name, threading.Lock())
+
+    def register_pipeline(self, name, task, model=None):
+        directory = os.path.join(self.shared_dir, name) if self.shared_dir else None
+        if directory and os.path.exists(os.path.join(directory, "model.safetensors")):
+            self.register(name, lambda: load_shared_pipeline(directory, task))
+        else:
+            self.register(name, lambda: load_pipeline(task, model))
+
+    def names(self):
+        with self._lock:
+            return list(self._factories)
+
+    def is_loaded(self, name):
+        with self._lock:
+            return name in self._models
+
+    def get(self, name):
+        # Load the model on first use; concurrent callers wait for the same load
+        with self._lock:
+            if name not in self._factories:
+                raise KeyError(f"Unknown model '{name}'")
+            model = self._models.get(name)
+            if model is not None:
+                self._last_used[name] = time.monotonic()
+                return model
+            load_lock = self._load_locks[name]
+
+        with load_lock:
+            with self._lock:
+                model = self._models.get(name)
+                factory = self._factories[name]
+            if model is None:
+                start = time.perf_counter()
+                model = factory()
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self._models[name] = model
+                    self.load_timings[name] = elapsed
+
+        with self._lock:
+            self._last_used[name] = time.monotonic()
+        return model
+
+    def warm_up(self, *names, on_done=None):
+        # Load models on a background thread so the UI never waits for them
+        names = names or tuple(self.names())
+
+        def worker():
+            errors = {}
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as exc:
+                    errors[name] = exc
+            if on_done is not None:
+                on_done(errors)
+
+        thread = threading.Thread(target=worker, name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def unload(self, name):
+        # Drop the registry's reference; the next get() reloads the model
+        with self._load_locks.get(name, threading.Lock()):
+            with self._lock:
+                self._last_used.pop(name, None)
+                return self._models.pop(name, None) is not None
+
+    def unload_idle(self, max_idle=None):
+        max_idle = self.idle_timeout if max_idle is None else max_idle
+        now = time.monotonic()
+        with self._lock:
+            idle = [name for name, used in self._last_used.items() if now - used >= max_idle]
+        return [name for name in idle if self.unload(name)]
+
+
+class StartupTimer:
+    def __init__(self):
+        self.stages = []
+        self._started = time.perf_counter()
+        self._last = self._started
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.stages.append((stage, now - self._last))
+        self._last = now
+
+    def total(self):
+        return self._last - self._started
+
+    def report(self):
+        parts = [f"{stage} {elapsed * 1000:.1f} ms" for stage, elapsed in self.stages]
+        return f"Startup {self.total() * 1000:.1f} ms: " + ", ".join(parts)
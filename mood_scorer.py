@@ -0,0 +1,98 @@
+import math
+import re
+import threading
+
+from metrics import METRICS
+from sentiment_service import normalize_text
+
+# Mood texts go through a cascade of scorers, cheapest first. Each tier returns
+# {"label", "score"} like the transformers sentiment pipeline, where score is its
+# confidence in the label; the first tier at or above the threshold answers and the
+# last tier always does.
+
+# Word -> polarity; kept small and unambiguous, anything subtler goes to the model
+LEXICON = {
+    "great": 2.5, "good": 1.5, "happy": 2.5, "glad": 2.0, "excited": 2.5, "amazing": 3.0,
+    "awesome": 3.0, "fantastic": 3.0, "wonderful": 3.0, "excellent": 3.0, "calm": 1.5,
+    "relaxed": 2.0, "rested": 1.5, "energized": 2.5, "energetic": 2.5, "motivated": 2.5,
+    "productive": 2.0, "focused": 1.5, "confident": 2.0, "cheerful": 2.5, "content": 1.5,
+    "fine": 1.0, "ok": 0.5, "okay": 0.5, "better": 1.0, "love": 2.5, "joyful": 3.0,
+    "peaceful": 2.0, "fresh": 1.5, "proud": 2.0, "grateful": 2.0, "optimistic": 2.0,
+    "bad": -2.0, "sad": -2.5, "tired": -2.0, "exhausted": -3.0, "stressed": -2.5,
+    "anxious": -2.5, "worried": -2.0, "angry": -2.5, "upset": -2.5, "depressed": -3.0,
+    "overwhelmed": -3.0, "awful": -3.0, "terrible": -3.0, "horrible": -3.0, "miserable": -3.0,
+    "burned": -1.5, "burnt": -1.5, "drained": -2.5, "sick": -2.0, "lonely": -2.0,
+    "frustrated": -2.5, "annoyed": -2.0, "nervous": -2.0, "sleepy": -1.5, "bored": -1.5,
+    "unmotivated": -2.5, "worse": -1.5, "hate": -2.5, "low": -1.0, "down": -1.0,
+    "panicked": -3.0, "irritated": -2.0, "meh": -0.5, "unwell": -2.0, "hopeless": -3.0,
+}
+NEGATORS = frozenset({"not", "no", "never", "hardly", "barely", "dont", "don't", "isnt", "isn't", "wasnt", "wasn't", "cant", "can't", "nothing"})
+INTENSIFIERS = {"very": 1.5, "really": 1.5, "so": 1.3, "extremely": 2.0, "super": 1.5, "totally": 1.5, "quite": 1.2, "bit": 0.6, "slightly": 0.6, "little": 0.6}
+CONTRASTS = frozenset({"but", "though", "although", "however", "yet"})
+NEGATION_SCOPE = 3  # Words after a negator whose polarity is flipped
+
+_WORD_RE = re.compile(r"[a-z']+")
+
+
+class LexiconScorer:
+    # Offline word-list scorer: polarity sums with negation, intensifiers and
+    # "but" clauses, squashed into a confidence. Answers in microseconds.
+
+    def __init__(self, lexicon=LEXICON, steepness=1.2):
+        self.lexicon = lexicon
+        self.steepness = steepness  # How fast confidence rises with total polarity
+
+    def polarity(self, text):
+        total = 0.0
+        negated = 0
+        boost = 1.0
+        for word in _WORD_RE.findall(normalize_text(text)):
+            if word in CONTRASTS:
+                # The clause after "but" carries the mood; what came before counts for less
+                total *= 0.3
+                negated, boost = 0, 1.0
+            elif word in NEGATORS or word.endswith("n't"):
+                negated = NEGATION_SCOPE
+            elif word in INTENSIFIERS:
+                boost *= INTENSIFIERS[word]
+            else:
+                value = self.lexicon.get(word)
+                if value is not None:
+                    total += -value * 0.5 if negated else value * boost
+                    boost = 1.0
+                negated = max(negated - 1, 0)
+        return total
+
+    def __call__(self, text):
+        polarity = self.polarity(text)
+        confidence = 1.0 / (1.0 + math.exp(-self.steepness * abs(polarity)))
+        label = "NEGATIVE" if polarity < 0 else "POSITIVE" if polarity > 0 else "NEUTRAL"
+        return {"label": label, "score": confidence}
+
+
+class MoodCascade:
+    def __init__(self, tiers, threshold=0.85):
+        # tiers: [(name, scorer)] cheapest first; scorer(text) -> {"label", "score"}
+        self.tiers = list(tiers)
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self.answered = {name: 0 for name, scorer in self.tiers}
+
+    def score(self, text, threshold=None):
+        # Returns the answering tier's result with its name under "tier"
+        threshold = self.threshold if threshold is None else threshold
+        last = len(self.tiers) - 1
+        for i, (name, scorer) in enumerate(self.tiers):
+            with METRICS.timer(f"mood_{name}"):
+                result = scorer(text)
+            if i == last or result["score"] >= threshold:
+                with self._lock:
+                    self.answered[name] += 1
+                METRICS.increment(f"mood_answered_{name}")
+                return dict(result, tier=name)
+
+    def stats(self):
+        with self._lock:
+            answered = dict(self.answered)
+        total = sum(answered.values())
+        return {"answered": answered, "fast_share": (total - answered[self.tiers[-1][0]]) / total if total else 0.0}
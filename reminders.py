@@ -0,0 +1,175 @@
+import datetime
+import heapq
+import itertools
+import threading
+import time
+from collections import namedtuple
+
+Reminder = namedtuple("Reminder", ["id", "due", "message", "repeat", "group"])
+
+
+def _timestamp(value):
+    if isinstance(value, datetime.datetime):
+        return value.timestamp()
+    return float(value)
+
+
+def _seconds(value):
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+    return value
+
+
+class ReminderScheduler:
+    # Min-heap of due times served by one thread that sleeps exactly until the
+    # next reminder is due and is woken early whenever the heap changes.
+    # Cancelled entries stay in the heap and are skipped when they surface.
+
+    def __init__(self, deliver, clock=time.time, grace=5 * 60, max_wait=5 * 60):
+        self.deliver = deliver  # Called from the scheduler thread; GUIs should hand off to their own thread
+        self.clock = clock
+        self.grace = grace  # Reminders found more than this many seconds late are dropped instead of delivered
+        self.max_wait = max_wait  # Re-check the wall clock at least this often in case of suspend or clock changes
+        self._heap = []
+        self._active = {}
+        self._groups = {}
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="reminders", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def __len__(self):
+        with self._cond:
+            return len(self._active)
+
+    def _push(self, reminder):
+        self._active[reminder.id] = reminder
+        if reminder.group is not None:
+            self._groups.setdefault(reminder.group, set()).add(reminder.id)
+        heapq.heappush(self._heap, (reminder.due, reminder.id))
+
+    def _discard(self, reminder_id):
+        reminder = self._active.pop(reminder_id, None)
+        if reminder is not None and reminder.group is not None:
+            members = self._groups.get(reminder.group)
+            if members is not None:
+                members.discard(reminder_id)
+                if not members:
+                    del self._groups[reminder.group]
+        return reminder
+
+    def _compact(self):
+        # Rebuild once cancelled entries outnumber live ones, so the heap stays O(live)
+        if len(self._heap) > 2 * len(self._active) + 64:
+            self._heap = [(r.due, r.id) for r in self._active.values()]
+            heapq.heapify(self._heap)
+
+    def add(self, due, message, repeat=None, group=None):
+        with self._cond:
+            reminder = Reminder(next(self._ids), _timestamp(due), message, _seconds(repeat), group)
+            self._push(reminder)
+            self._cond.notify()
+            return reminder.id
+
+    def cancel(self, reminder_id):
+        with self._cond:
+            found = self._discard(reminder_id) is not None
+            self._compact()
+            self._cond.notify()
+            return found
+
+    def cancel_group(self, group):
+        with self._cond:
+            for reminder_id in list(self._groups.get(group, ())):
+                self._discard(reminder_id)
+            self._compact()
+            self._cond.notify()
+
+    def replace_group(self, group, items):
+        # Swap every reminder in a group at once; items are (due, message) or (due, message, repeat)
+        with self._cond:
+            for reminder_id in list(self._groups.get(group, ())):
+                self._discard(reminder_id)
+            for item in items:
+                due, message = item[0], item[1]
+                repeat = item[2] if len(item) > 2 else None
+                self._push(Reminder(next(self._ids), _timestamp(due), message, _seconds(repeat), group))
+            self._compact()
+            self._cond.notify()
+
+    def pending(self):
+        with self._cond:
+            return sorted(self._active.values())
+
+    def next_due(self):
+        with self._cond:
+            self._drop_stale_head()
+            return self._heap[0][0] if self._heap else None
+
+    def _drop_stale_head(self):
+        while self._heap:
+            due, reminder_id = self._heap[0]
+            reminder = self._active.get(reminder_id)
+            if reminder is not None and reminder.due == due:
+                return
+            heapq.heappop(self._heap)
+
+    def _pop_due(self):
+        # Wait until the head is due; returns the reminders to deliver, or None when stopped
+        with self._cond:
+            while self._running:
+                self._drop_stale_head()
+                if not self._heap:
+                    self._cond.wait(self.max_wait)
+                    continue
+                delay = self._heap[0][0] - self.clock()
+                if delay > 0:
+                    self._cond.wait(min(delay, self.max_wait))
+                    continue
+
+                now = self.clock()
+                ready = []
+                while self._heap and self._heap[0][0] <= now:
+                    due, reminder_id = heapq.heappop(self._heap)
+                    reminder = self._active.get(reminder_id)
+                    if reminder is None or reminder.due != due:
+                        continue
+                    if reminder.repeat:
+                        # Recurring reminders skip occurrences missed while asleep
+                        missed = int((now - due) // reminder.repeat) + 1
+                        self._active[reminder_id] = reminder._replace(due=due + missed * reminder.repeat)
+                        heapq.heappush(self._heap, (self._active[reminder_id].due, reminder_id))
+                    else:
+                        self._discard(reminder_id)
+                    if now - due <= self.grace:
+                        ready.append(reminder)
+                if ready:
+                    return ready
+            return None
+
+    def _run(self):
+        while True:
+            ready = self._pop_due()
+            if ready is None:
+                return
+            for reminder in ready:
+                try:
+                    self.deliver(reminder)
+                except Exception as exc:
+                    print(f"Reminder delivery failed: {exc}")
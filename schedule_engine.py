@@ -0,0 +1,615 @@
+import collections
+import datetime
+import os
+import random
+import zlib
+
+from behavior_stats import BehaviorStats
+from goal_expiry import ExpiryIndex
+from goal_planner import GoalPlanner, to_ordinal
+from metrics import timed
+from schedule_index import ScheduleIndex, parse_minute, parse_slot
+from schedule_template import load_template
+from task_catalog import TaskCatalog
+
+# The scheduling engine never imports Tk, so it can run headless in batch jobs and worker processes
+
+DEFAULT_STUDY_PATHS = [
+    "Advanced Math", "Physics", "Machine Learning", "Network Security", "Cryptography",
+    "Software Engineering", "Data Analysis", "Quantum Computing"
+]
+DEFAULT_DAILY_TASKS = [
+    "Exercise", "Meal Prep", "Relax", "Meditation", "Grocery Shopping", "House Chores",
+    "Reading", "Creative Writing", "Project Work"
+]
+DEFAULT_BREAKS = ["Short Break", "Long Break"]
+
+# Built-in timetable segments, used unless the user's template file exists
+TIMETABLE = [
+    ("MORNING ROUTINE", "5:45 AM", "8:00 AM", [
+        ("5:45 AM - 6:00 AM", "Wake up & Hydrate"),
+        ("6:00 AM - 7:00 AM", "Exercise (Physical/Stretching)"),
+        ("7:00 AM - 8:00 AM", "Breakfast")
+    ]),
+    ("PLANNING AND JOURNALING", "8:00 AM", "9:00 AM", [
+        ("8:00 AM - 9:00 AM", "Plan the day and journal thoughts")
+    ]),
+    ("WORK SLOT: BUSINESS", "9:00 AM", "12:30 PM", [
+        ("9:00 AM - 12:30 PM", "Focused work on business strategy, research, or other business-related tasks")
+    ]),
+    ("MIDDAY BREAK", "12:30 PM", "1:30 PM", [
+        ("12:30 PM - 1:30 PM", "Lunch and relaxation")
+    ]),
+    ("PERSONAL DEVELOPMENT: READING", "1:30 PM", "3:00 PM", [
+        ("1:30 PM - 3:00 PM", "Reading for personal growth or skill development")
+    ]),
+    ("WORK SLOT: LEARNING", "3:00 PM", "8:00 PM", [
+        ("3:00 PM - 5:30 PM", "Learning courses or skills development"),
+        ("5:45 PM - 8:00 PM", "Focused work on projects or assignments")
+    ]),
+    ("EVENING ROUTINE", "8:00 PM", "11:00 PM", [
+        ("8:00 PM - 9:00 PM", "Networking or community engagement"),
+        ("9:00 PM - 10:00 PM", "Dinner & Relaxation"),
+        ("10:00 PM - 11:00 PM", "Review the day and plan for tomorrow")
+    ])
+]
+
+# Timetable slots parsed once into (start, end, task) minute offsets
+TIMETABLE_SLOTS = tuple(
+    parse_slot(slot) + (task,)
+    for segment_name, start_time_str, end_time_str, tasks in TIMETABLE
+    for slot, task in tasks
+)
+
+DAY_START = parse_minute("5:45 AM")
+DAY_END = parse_minute("11:00 PM")
+FILL_SLOT_MINUTES = 60
+
+# Generated days kept for reuse when nothing they depend on has changed
+DAY_CACHE_SIZE = 8
+
+# Hours whose decayed completion rate falls below this get the calm task pool
+LOW_ENERGY_RATE = 0.35
+
+# Planned goal work is carved out of this timetable block
+GOAL_BLOCK_TASK = "Focused work on projects or assignments"
+
+
+# A goal taken out of the active pool: reason is "expired" or "completed"; completed and
+# dropped list its subtasks that were and were not done
+ArchivedGoal = collections.namedtuple("ArchivedGoal", ["kind", "name", "deadline", "reason", "completed", "dropped"])
+
+
+def goal_block(template):
+    # (start, end) of the template's project block, or None if it has none
+    return next(((start, end) for start, end, task in template if task == GOAL_BLOCK_TASK), None)
+
+
+def profile_seed(profile_id, base_seed=0):
+    # Stable across runs and processes, unlike hash() on strings
+    return zlib.crc32(f"{base_seed}:{profile_id}".encode("utf-8"))
+
+
+class ScheduleEngine:
+    def __init__(self, seed=None, start_day=None):
+        self.schedule = ScheduleIndex()
+        self.schedule_day = None
+        self.study_paths = list(DEFAULT_STUDY_PATHS)
+        self.breaks = list(DEFAULT_BREAKS)
+        # Tasks to fill free slots with, indexed for weighted sampling
+        self.catalog = TaskCatalog(DEFAULT_DAILY_TASKS, calm_tasks=self.breaks + ["Meditation", "Relax"])
+        self.sleep_schedule = "Sleep"
+        self.targets = {}
+        self.yearly_tasks = {}
+        self.complex_tasks = {}
+        # Goals leave the task pool when their deadline passes or all their subtasks are done,
+        # so its size follows the live goals rather than everything ever added
+        self.expiry = ExpiryIndex()
+        self.goal_subtasks = {}  # (kind, name) -> {subtask: completed}
+        self._subtask_goals = {}  # Open subtask -> (kind, name)
+        self.archived = []  # ArchivedGoal records not yet saved; see take_archived
+        # Similarity index over the daily tasks (goal steps excluded) that added tasks are matched against;
+        # built on first use with these TaskIndex options
+        self._task_index = None
+        self._task_index_options = {}
+        # Deadline-aware plan of goal steps across the coming weeks
+        self.planner = GoalPlanner(start=start_day)
+        self.set_template(TIMETABLE_SLOTS)
+        self.template_path = None  # Template file checked for edits before each day is generated
+        self.pins = {}  # date -> {start minute: (end minute, task)} of manual edits regeneration keeps
+        self._day_cache = collections.OrderedDict()  # Inputs of a generated day -> its slots
+        self._fills = (None, {})  # ((day, preferences), {(start, end): task}) of the last generated day's gap fills
+        # Imported calendar events: (first day, end day) -> [(date, start minute, end minute, task)], e.g. Store.busy_between
+        self.busy_source = None
+        self.user_preferences = {
+            "productive_hours": (9, 17),  # Default productive hours from 9 AM to 5 PM
+            "preferred_tasks": [],
+            "stress_level": "normal",  # Can be "low", "normal", "high"
+            "reminder_lead_minutes": 5,  # Pre-alert before each slot; 0 disables it
+            "mood_confidence_threshold": 0.85,  # Lexicon scores below this are re-scored by the sentiment model
+            "metrics_enabled": False,  # Record timing histograms (see metrics.py)
+            "metrics_path": "daily_life_metrics.prom",  # Rewritten periodically while metrics are on; .json for JSON
+            "template_path": "timetable.txt",  # Timetable template (see schedule_template.py); the built-in one if missing
+            "task_matching": "ngram"  # How added tasks are matched to existing ones: "ngram" or "model" (see task_index.py)
+        }
+        self.stats = BehaviorStats()  # Decayed completion statistics for behavior learning
+        self.achievements = []  # Track achievements for motivation
+        self.rng = random.Random(seed)
+
+    @classmethod
+    def from_profile(cls, profile, base_seed=0, start_day=None):
+        seed = profile.get("seed")
+        if seed is None:
+            seed = profile_seed(profile.get("id"), base_seed)
+        engine = cls(seed=seed, start_day=start_day)
+        engine.user_preferences.update(profile.get("preferences", {}))
+        for key in ("study_paths", "breaks"):
+            if key in profile:
+                setattr(engine, key, list(profile[key]))
+        if "daily_tasks" in profile or "breaks" in profile:
+            tasks = profile.get("daily_tasks", DEFAULT_DAILY_TASKS)
+            engine.catalog = TaskCatalog(tasks, calm_tasks=engine.breaks + ["Meditation", "Relax"])
+        for target, deadline in profile.get("targets", {}).items():
+            engine.add_target(target, deadline)
+        for yearly_task, deadline in profile.get("yearly_tasks", {}).items():
+            engine.add_yearly_task(yearly_task, deadline)
+        for complex_task, deadline in profile.get("complex_tasks", {}).items():
+            engine.add_complex_task(complex_task, deadline)
+        for task, outcome, recorded_at in profile.get("task_completion_history", []):
+            engine.record_outcome(task, outcome == "completed", datetime.datetime.fromisoformat(recorded_at))
+        return engine
+
+    @property
+    def daily_tasks(self):
+        return self.catalog.tasks()
+
+    def set_template(self, slots):
+        # slots are compiled (start, end, task) minute offsets
+        self.template = tuple(slots)
+        self.goal_block = goal_block(self.template)
+        self.planner.set_capacity(self.goal_block[1] - self.goal_block[0] if self.goal_block else 0)
+
+    def load_template(self, path):
+        # Use the template file at path if it exists; returns True if it was loaded
+        try:
+            slots = load_template(path)
+        except (OSError, ValueError) as e:
+            print(f"Could not load timetable template {path}: {e}")
+            return False
+        if slots is None:
+            return False
+        if slots is not self.template:  # An unchanged file returns the same compiled tuple
+            self.set_template(slots)
+        return True
+
+    def add_task(self, start, end, task):
+        return self.schedule.add(start, end, task)
+
+    def add_target(self, target, deadline):
+        self.targets[target] = deadline
+        self._track_goal("target", target, deadline, self.break_down_target(target))
+        self.planner.add_goal(target, "target", deadline)
+
+    def add_yearly_task(self, yearly_task, deadline):
+        self.yearly_tasks[yearly_task] = deadline
+        self._track_goal("yearly", yearly_task, deadline, self.break_down_yearly_task(yearly_task))
+        self.planner.add_goal(yearly_task, "yearly", deadline)
+
+    def add_complex_task(self, complex_task, deadline):
+        self.complex_tasks[complex_task] = deadline
+        self._track_goal("complex", complex_task, deadline, self.break_down_complex_task(complex_task))
+        self.planner.add_goal(complex_task, "complex", deadline)
+
+    def _goals(self, kind):
+        return {"target": self.targets, "yearly": self.yearly_tasks, "complex": self.complex_tasks}[kind]
+
+    def _track_goal(self, kind, name, deadline, subtasks):
+        goal_key = (kind, name)
+        self.goal_subtasks[goal_key] = dict.fromkeys(subtasks, False)
+        for subtask in subtasks:
+            self._subtask_goals[subtask] = goal_key
+        self.expiry.add(goal_key, deadline)
+
+    def _archive(self, goal_key, reason):
+        kind, name = goal_key
+        deadline = datetime.date.fromordinal(to_ordinal(self._goals(kind).pop(name))).isoformat()
+        subtasks = self.goal_subtasks.pop(goal_key, {})
+        for subtask, completed in subtasks.items():
+            if not completed:
+                self._subtask_goals.pop(subtask, None)
+                self.catalog.remove(subtask)
+                self.stats.forget(subtask)
+        self.planner.remove_goal(name, kind)
+        self.expiry.discard(goal_key)
+        record = ArchivedGoal(kind, name, deadline, reason,
+                              [task for task, completed in subtasks.items() if completed],
+                              [task for task, completed in subtasks.items() if not completed])
+        self.archived.append(record)
+        return record
+
+    def complete_subtask(self, subtask):
+        # Drop a finished subtask from the pool; the goal is archived once all of them are done
+        goal_key = self._subtask_goals.pop(subtask, None)
+        if goal_key is None:
+            return False
+        subtasks = self.goal_subtasks[goal_key]
+        subtasks[subtask] = True
+        self.catalog.remove(subtask)
+        self.stats.forget(subtask)
+        # Subtasks are listed in step order, so the planner stops assigning this step's minutes
+        self.planner.complete_step(goal_key, list(subtasks).index(subtask))
+        if all(subtasks.values()):
+            self._archive(goal_key, "completed")
+        return True
+
+    def expire_goals(self, day=None):
+        # Archive goals whose deadline is before day; returns their ArchivedGoal records
+        return [self._archive(goal_key, "expired") for goal_key, deadline in self.expiry.pop_expired(day or datetime.date.today())]
+
+    def take_archived(self):
+        # Records archived since the last call, for the caller to save
+        archived, self.archived = self.archived, []
+        return archived
+
+    def completed_subtasks(self):
+        # Finished subtasks of goals still in progress, for storage meta
+        return [task for subtasks in self.goal_subtasks.values() for task, completed in subtasks.items() if completed]
+
+    def base_task(self, label):
+        # Schedule labels may carry advice after the catalog task name
+        while label not in self.catalog and " - " in label:
+            label = label.rsplit(" - ", 1)[0]
+        return label
+
+    def record_outcome(self, label, completed, when=None):
+        # Feed a completion or skip into the statistics and the task's sampling weight
+        task = self.base_task(label)
+        self.stats.record(task, completed, when)
+        if task in self.catalog:
+            self.catalog.set_adjustment(task, self.stats.task_weight(task, when))
+        if completed:
+            self.complete_subtask(task)
+        return task
+
+    def refresh_adjustments(self):
+        # Apply the statistics to every known task, e.g. after loading them
+        for task in self.stats.tasks():
+            if task in self.catalog:
+                self.catalog.set_adjustment(task, self.stats.task_weight(task))
+
+    def load_state(self, store):
+        # Restore the template, added tasks, goals, statistics, pinned edits and achievements from a storage.Store
+        self.template_path = self.user_preferences.get("template_path")
+        if self.template_path:
+            self.load_template(self.template_path)
+        self._task_index = None
+        for task, count in store.load_tasks():
+            self.catalog.add(task, count)
+        goals = store.load_goals()
+        for target, deadline in goals["target"].items():
+            self.add_target(target, deadline)
+        for yearly_task, deadline in goals["yearly"].items():
+            self.add_yearly_task(yearly_task, deadline)
+        for complex_task, deadline in goals["complex"].items():
+            self.add_complex_task(complex_task, deadline)
+        saved_stats = store.get_meta("behavior_stats")
+        if saved_stats:
+            self.stats = BehaviorStats.from_dict(saved_stats)
+            self.refresh_adjustments()
+        else:
+            # First run with statistics: fold in any recorded history once
+            for task, outcome, recorded_at in store.iter_history():
+                self.record_outcome(task, outcome == "completed", datetime.datetime.fromisoformat(recorded_at))
+            store.set_meta("behavior_stats", self.stats.to_dict())
+        for subtask in store.get_meta("completed_subtasks", []):
+            self.complete_subtask(subtask)
+        self.restore_pins(store.get_meta("pinned_slots", {}))
+        self.busy_source = store.busy_between
+        self.achievements = [name for name, achieved_at in store.load_achievements()]
+
+    def apply_command(self, command):
+        # Apply a parsed natural-language command; returns the command as applied, or None if it was not understood.
+        # A task matching an existing one is merged into it, which raises that task's weight instead.
+        if command.action == "task":
+            existing, similar = self.task_index().resolve(command.name)
+            if existing is not None and existing != command.name:
+                command = command._replace(
+                    name=existing, feedback=f"'{command.name}' matches your task '{existing}', which will now come up more often."
+                )
+            elif similar:
+                listed = ", ".join(f"'{task}'" for task in similar)
+                command = command._replace(feedback=f"{command.feedback} Similar tasks you already have: {listed}.")
+            self.catalog.add(command.name)
+            self.task_index().add(command.name)
+        elif command.action == "target":
+            self.add_target(command.name, command.deadline)
+        elif command.action == "yearly":
+            self.add_yearly_task(command.name, command.deadline)
+        elif command.action == "complex":
+            self.add_complex_task(command.name, command.deadline)
+        else:
+            return None
+        return command
+
+    def task_index(self):
+        if self._task_index is None:
+            # Imported here so NumPy is only needed once tasks are added
+            from task_index import TaskIndex
+
+            index = TaskIndex(**self._task_index_options)
+            index.add_many(task for task in self.catalog if task not in self._subtask_goals)
+            self._task_index = index
+        return self._task_index
+
+    def use_task_embeddings(self, embed, merge_similarity=0.95, suggest_similarity=0.8):
+        # Match added tasks by model embeddings (task_index.model_embedder) instead of n-grams, or n-grams again
+        # when embed is None. Model similarities run higher, hence the stricter thresholds.
+        if embed is None:
+            self._task_index_options = {}
+        else:
+            self._task_index_options = {"embed": embed, "merge_similarity": merge_similarity, "suggest_similarity": suggest_similarity}
+        self._task_index = None
+        self.task_index()  # Embeds the catalog now rather than on the next added task
+
+    def break_down_target(self, target):
+        # Break down a target into smaller tasks
+        tasks = [f"{target} - Step {i+1}" for i in range(5)]
+        self.catalog.add_many(tasks)
+        return tasks
+
+    def break_down_yearly_task(self, yearly_task):
+        # Break down a yearly task into monthly tasks
+        tasks = [f"{yearly_task} - Month {month}" for month in range(1, 13)]
+        self.catalog.add_many(tasks)
+        return tasks
+
+    def break_down_complex_task(self, complex_task):
+        # Break down a complex task into weekly tasks
+        tasks = [f"{complex_task} - Week {week}" for week in range(1, 5)]
+        self.catalog.add_many(tasks)
+        return tasks
+
+    def pins_state(self):
+        # JSON-friendly pinned edits from today on, for storage meta
+        today = datetime.date.today()
+        return {
+            day.isoformat(): {str(start): [end, task] for start, (end, task) in pins.items()}
+            for day, pins in self.pins.items() if day >= today and pins
+        }
+
+    def restore_pins(self, state):
+        today = datetime.date.today()
+        for day_text, pins in state.items():
+            day = datetime.date.fromisoformat(day_text)
+            if day >= today:
+                self.pins[day] = {int(start): (end, task) for start, (end, task) in pins.items()}
+
+    @timed("generate_daily_schedule")
+    def generate_daily_schedule(self, day=None, fresh=False):
+        # A day is rebuilt only when its template, preferences, task catalog, recorded outcomes, goal
+        # work or pins changed; even then, gap fills whose slot and task survive keep their previous pick.
+        # fresh=True samples every gap again.
+        self.schedule_day = day = day or datetime.date.today()
+        if self.template_path:
+            self.load_template(self.template_path)  # Only re-parsed when the file changed
+        self.expire_goals(day)
+        if self.stats.events:
+            self.catalog.set_preferred(self.user_preferences.get("preferred_tasks", []))  # Before the catalog version is read
+        allocations = self.goal_allocations(day)
+        preferences = repr(sorted(self.user_preferences.items()))
+        pins = self.pins.get(day, {})
+        busy = self.busy_on(day)
+        # The inputs themselves, not their hash, so a collision can never return another day's slots
+        key = (
+            day, self.template, preferences, self.catalog.version, self.stats.events, tuple(busy),
+            tuple(sorted(pins.items())), tuple((step.key, minutes) for step, minutes in allocations)
+        )
+        cached = None if fresh else self._day_cache.get(key)
+        if cached is not None:
+            self._day_cache.move_to_end(key)
+            self.schedule.clear()
+            for start, end, task in cached:
+                self.add_task(start, end, task)
+            return self.schedule
+
+        self.schedule.clear()
+        for start, end, task in self.template:
+            self.add_task(start, end, task)
+        self.place_goal_work(allocations)
+        self.place_busy(busy)
+        for start, (end, task) in sorted(pins.items()):
+            slot = self.schedule.get(start)
+            if slot is not None and slot.end == end:
+                self.schedule.replace(start, task)
+            elif self.schedule.is_free(start, end):
+                self.add_task(start, end, task)
+
+        # Fill the gaps the timetable leaves between 5:45 AM and 11:00 PM with dynamic tasks
+        previous = {} if fresh or self._fills[0] != (day, preferences) else self._fills[1]
+        fills = {}
+        for gap_start, gap_end in list(self.schedule.free_gaps(DAY_START, DAY_END)):
+            current = gap_start
+            while current < gap_end:
+                end = min(current + FILL_SLOT_MINUTES, gap_end)
+                hour = current // 60
+                if hour < 8:
+                    task = "Morning Exercise - Start your day with some physical activity!"
+                elif hour >= 21:
+                    task = f"{self.sleep_schedule} - Time to rest and recharge for tomorrow."
+                else:
+                    task = previous.get((current, end))
+                    if task is None or self.base_task(task) not in self.catalog:
+                        task = self.choose_task(hour)
+                fills[(current, end)] = task
+                self.add_task(current, end, task)
+                current = end
+        self._fills = ((day, preferences), fills)
+
+        self._day_cache[key] = list(self.schedule)
+        if len(self._day_cache) > DAY_CACHE_SIZE:
+            self._day_cache.popitem(last=False)
+        return self.schedule
+
+    @timed("generate_range")
+    def generate_range(self, start=None, days=7, busy=()):
+        # Week and month views: every day of the range is generated at once with NumPy.
+        # busy holds fixed appointments as (date, start_minute, end_minute, task).
+        import numpy as np
+        from calendar_range import CalendarRange, SLOT_MINUTES, sample_alias
+
+        start = start or datetime.date.today()
+        self.expire_goals(start)
+        calendar = CalendarRange(start, days)
+        calendar.apply_template(self.template)
+
+        goal_work = []
+        if self.goal_block is not None:
+            block_start, block_end = self.goal_block
+            for day, allocations in self.planner.plan_range(start, start + datetime.timedelta(days=days)).items():
+                current = block_start
+                for step, minutes in allocations:
+                    goal_work.append((day, current, min(current + minutes, block_end), step.name))
+                    current += minutes
+        calendar.place(goal_work)
+        # Pinned edits as in the single-day view; a busy block placed over one takes its time
+        end_day = start + datetime.timedelta(days=days)
+        calendar.place(
+            (day, pin_start, pin_end, task)
+            for day, pins in self.pins.items() if start <= day < end_day
+            for pin_start, (pin_end, task) in pins.items()
+        )
+        calendar.place(busy)
+        if self.busy_source is not None:
+            calendar.place(self.busy_source(start, start + datetime.timedelta(days=days)))
+
+        personalized = bool(self.stats.events)
+        if personalized:
+            self.catalog.set_preferred(self.user_preferences.get("preferred_tasks", []))
+        table = self.catalog.table(self.user_preferences.get("stress_level", "normal"), personalized)
+        generator = np.random.default_rng(self.rng.getrandbits(64))
+
+        def choose(rows, start_slots, count):
+            # Same rules as the single-day fill: exercise before 8 AM, sleep from 9 PM
+            hours = start_slots * SLOT_MINUTES // 60
+            tasks = iter(sample_alias(table, generator, count))
+            labels = []
+            for hour in hours.tolist():
+                if hour < 8:
+                    labels.append("Morning Exercise - Start your day with some physical activity!")
+                elif hour >= 21:
+                    labels.append(f"{self.sleep_schedule} - Time to rest and recharge for tomorrow.")
+                else:
+                    labels.append(next(tasks))
+            return labels
+
+        calendar.fill_gaps(*calendar.free_gaps(DAY_START, DAY_END), choose)
+        return calendar
+
+    def goal_allocations(self, day):
+        # [(Step, minutes)] of goal work planned for the day
+        self.planner.advance(day)
+        return self.planner.allocations_on(day)
+
+    def place_goal_work(self, allocations):
+        # Replace the start of the project block with the day's goal steps
+        if not allocations:
+            return
+        block = next((slot for slot in self.schedule if slot.task == GOAL_BLOCK_TASK), None)
+        if block is None:
+            return
+        self.schedule.remove(block.start)
+        current = block.start
+        for step, minutes in allocations:
+            end = min(current + minutes, block.end)
+            self.add_task(current, end, step.name)
+            current = end
+        if current < block.end:
+            self.add_task(current, block.end, GOAL_BLOCK_TASK)
+
+    def busy_on(self, day):
+        # [(start, end, task)] of imported busy blocks on one day
+        if self.busy_source is None:
+            return []
+        return [(start, end, task) for _, start, end, task in self.busy_source(day, day + datetime.timedelta(days=1))]
+
+    def place_busy(self, blocks):
+        # Busy blocks take their time from whatever was there, trimming the slots around them
+        for start, end, task in blocks:
+            for slot in self.schedule.overlapping(start, end):
+                self.schedule.remove(slot.start)
+                if slot.start < start:
+                    self.add_task(slot.start, start, slot.task)
+                if slot.end > end:
+                    self.add_task(end, slot.end, slot.task)
+            self.add_task(start, end, task)
+
+    def get_advice(self, topic):
+        # Simple advice-generating function
+        advice_list = [
+            f"Focus on consistency when working on {topic}.",
+            f"Break {topic} into smaller, manageable steps.",
+            f"Stay motivated by setting achievable goals for {topic}.",
+            f"Take regular breaks to maintain productivity while working on {topic}."
+        ]
+        return self.rng.choice(advice_list)
+
+    def adjust_task(self, start, new_task):
+        # Returns False when no slot starts at the given minute. The edit is pinned, so regenerating the day keeps it.
+        slot = self.schedule.get(start)
+        if slot is None:
+            return False
+        advice = self.get_advice(new_task)
+        slot = self.schedule.replace(start, f"{new_task} - {advice}")
+        day = self.schedule_day or datetime.date.today()
+        self.pins.setdefault(day, {})[start] = (slot.end, slot.task)
+        return True
+
+    @timed("choose_task")
+    def choose_task(self, hour=None):
+        # Enhanced task recommendation system
+        if not self.stats.events:
+            return self.catalog.sample(self.rng)
+
+        # Preferences and stress level select and weight a cached alias table, so each pick is O(1);
+        # completion history is already folded into the table weights
+        self.catalog.set_preferred(self.user_preferences.get("preferred_tasks", []))
+        stress_level = self.user_preferences.get("stress_level", "normal")
+        if hour is not None and self.stats.hour_rate(hour) < LOW_ENERGY_RATE:
+            stress_level = "high"
+        selected_task = self.catalog.sample(self.rng, stress_level, personalized=True)
+        if selected_task in self.catalog.preferred:
+            return selected_task
+        return f"{selected_task} - {self.get_advice(selected_task)}"
+
+
+def generate_profile_schedule(profile, base_seed=0, day=None):
+    engine = ScheduleEngine.from_profile(profile, base_seed, start_day=day)
+    return profile.get("id"), list(engine.generate_daily_schedule(day))
+
+
+def _generate_chunk(args):
+    profiles, base_seed, day = args
+    return [generate_profile_schedule(profile, base_seed, day) for profile in profiles]
+
+
+def generate_many(profiles, base_seed=0, day=None, workers=None, chunk_size=64):
+    # Generate one schedule per profile across a process pool; returns {profile_id: schedule}.
+    # Every profile gets its own seeded RNG, so the output is identical run to run
+    # regardless of worker count or chunking.
+    profiles = list(profiles)
+    day = day or datetime.date.today()
+    workers = workers or os.cpu_count() or 1
+    chunks = [(profiles[i:i + chunk_size], base_seed, day) for i in range(0, len(profiles), chunk_size)]
+
+    results = {}
+    if workers == 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            results.update(_generate_chunk(chunk))
+        return results
+
+    # Imported here: it pulls in multiprocessing, which single-profile callers such as the CLI never need
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_result in executor.map(_generate_chunk, chunks):
+            results.update(chunk_result)
+    return results
@@ -0,0 +1,144 @@
+import bisect
+import re
+from collections import namedtuple
+
+# Schedule slots are stored as integer minute offsets from midnight; display strings are only built when rendering
+
+MINUTES_PER_DAY = 24 * 60
+
+Slot = namedtuple("Slot", ["start", "end", "task"])
+
+_TIME_RE = re.compile(r"^\s*(\d{1,2}):(\d{2})\s*([AaPp][Mm])\s*$")
+
+
+def parse_minute(text):
+    # "5:45 AM" -> 345
+    match = _TIME_RE.match(text)
+    if not match:
+        raise ValueError(f"Invalid time '{text}'")
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2)), match.group(3).upper()
+    if not 1 <= hour <= 12 or minute > 59:
+        raise ValueError(f"Invalid time '{text}'")
+    return (hour % 12 + (12 if meridiem == "PM" else 0)) * 60 + minute
+
+
+def parse_slot(text):
+    # "5:45 AM - 6:00 AM" -> (345, 360); a single time is treated as a one-minute slot
+    parts = text.split(" - ")
+    start = parse_minute(parts[0])
+    end = parse_minute(parts[1]) if len(parts) > 1 else start + 1
+    if end <= start:
+        raise ValueError(f"Slot '{text}' ends before it starts")
+    return start, end
+
+
+def format_minute(minute):
+    hour, minute = divmod(minute % MINUTES_PER_DAY, 60)
+    return f"{hour % 12 or 12}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+
+def format_slot(start, end):
+    return f"{format_minute(start)} - {format_minute(end)}"
+
+
+class ScheduleIndex:
+    # Non-overlapping half-open intervals [start, end) kept in a sorted array.
+    # Lookups, overlap queries and gap searches are O(log n + k) via bisect.
+
+    def __init__(self):
+        self._starts = []
+        self._slots = []
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __iter__(self):
+        return iter(list(self._slots))
+
+    def __contains__(self, start):
+        return self._find(start) is not None
+
+    def clear(self):
+        self._starts.clear()
+        self._slots.clear()
+
+    def _find(self, start):
+        i = bisect.bisect_left(self._starts, start)
+        if i < len(self._starts) and self._starts[i] == start:
+            return i
+        return None
+
+    def get(self, start, default=None):
+        i = self._find(start)
+        return self._slots[i] if i is not None else default
+
+    def at(self, minute):
+        # The slot covering the given minute, if any
+        i = bisect.bisect_right(self._starts, minute) - 1
+        if i >= 0 and self._slots[i].end > minute:
+            return self._slots[i]
+        return None
+
+    def overlapping(self, start, end):
+        i = bisect.bisect_right(self._starts, start) - 1
+        if i < 0 or self._slots[i].end <= start:
+            i += 1
+        found = []
+        while i < len(self._slots) and self._slots[i].start < end:
+            found.append(self._slots[i])
+            i += 1
+        return found
+
+    def is_free(self, start, end):
+        i = bisect.bisect_right(self._starts, start) - 1
+        if i >= 0 and self._slots[i].end > start:
+            return False
+        return i + 1 >= len(self._starts) or self._starts[i + 1] >= end
+
+    def add(self, start, end, task):
+        if end <= start:
+            raise ValueError(f"Slot {format_slot(start, end)} ends before it starts")
+        if not self.is_free(start, end):
+            raise ValueError(f"Slot {format_slot(start, end)} overlaps an existing entry")
+        i = bisect.bisect_left(self._starts, start)
+        slot = Slot(start, end, task)
+        self._starts.insert(i, start)
+        self._slots.insert(i, slot)
+        return slot
+
+    def replace(self, start, task):
+        i = self._find(start)
+        if i is None:
+            raise KeyError(start)
+        slot = self._slots[i]._replace(task=task)
+        self._slots[i] = slot
+        return slot
+
+    def remove(self, start):
+        i = self._find(start)
+        if i is None:
+            raise KeyError(start)
+        del self._starts[i]
+        return self._slots.pop(i)
+
+    def free_gaps(self, lo=0, hi=MINUTES_PER_DAY, min_length=1):
+        # Yields (start, end) for every unoccupied stretch inside [lo, hi)
+        i = bisect.bisect_right(self._starts, lo) - 1
+        cursor = lo
+        if i >= 0:
+            cursor = max(cursor, self._slots[i].end)
+        i += 1
+        while cursor < hi:
+            next_start = self._starts[i] if i < len(self._starts) else hi
+            gap_end = min(next_start, hi)
+            if gap_end - cursor >= min_length:
+                yield cursor, gap_end
+            if i >= len(self._starts):
+                break
+            cursor = max(cursor, self._slots[i].end)
+            i += 1
+
+    def first_free(self, length, lo=0, hi=MINUTES_PER_DAY):
+        for start, end in self.free_gaps(lo, hi, length):
+            return start, start + length
+        return None
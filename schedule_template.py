@@ -0,0 +1,55 @@
+import os
+
+from schedule_index import ScheduleIndex, format_slot, parse_slot
+
+# User-editable timetables. A template is a text file with one fixed slot per line:
+#
+#   # Lines starting with # are comments
+#   5:45 AM - 6:00 AM | Wake up & Hydrate
+#   6:00 AM - 7:00 AM | Exercise (Physical/Stretching)
+#
+# A template is compiled once into sorted (start, end, task) minute offsets; loading an
+# unchanged file again returns the compiled slots without parsing it.
+#
+#   python cli.py template > timetable.txt     # start from the built-in timetable
+
+_compiled = {}  # Absolute path -> ((mtime, size), slots)
+
+
+def compile_template(lines, source="template"):
+    # Returns a tuple of (start, end, task); raises ValueError naming the bad line
+    index = ScheduleIndex()
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        time_text, separator, task = line.partition("|")
+        task = task.strip()
+        if not separator or not task:
+            raise ValueError(f"{source}:{number}: expected 'start - end | task'")
+        try:
+            index.add(*parse_slot(time_text.strip()), task)
+        except ValueError as e:
+            raise ValueError(f"{source}:{number}: {e}")
+    return tuple(tuple(slot) for slot in index)
+
+
+def format_template(slots):
+    return "".join(f"{format_slot(start, end)} | {task}\n" for start, end, task in slots)
+
+
+def load_template(path):
+    # Compiled slots from a template file, or None if it does not exist
+    path = os.path.abspath(path)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _compiled.get(path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with open(path, encoding="utf-8") as f:
+        slots = compile_template(f, source=path)
+    _compiled[path] = (version, slots)
+    return slots
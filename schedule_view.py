@@ -0,0 +1,98 @@
+# Keeps a Treeview in sync with a list of rows without rebuilding it. Rows are
+# (row id, values) in display order. Each render only inserts, updates, moves or
+# deletes the ids that changed, and only the rows around the visible part (plus a
+# buffer on each side) are kept in the widget, so month views stay cheap to scroll.
+
+
+class ScheduleView:
+    def __init__(self, tree, visible_rows=20, buffer_rows=50, scrollbar=None):
+        self.tree = tree
+        self.visible_rows = visible_rows
+        self.buffer_rows = buffer_rows
+        self.scrollbar = scrollbar  # Driven by the view in place of the tree, since the tree only holds a window
+        self.rows = []
+        self.top = 0  # Index of the first visible row
+        self._shown = {}  # Row id -> values currently in the widget, in widget order
+        self._window = (0, 0)  # [lo, hi) slice of self.rows held by the widget
+
+    def set_rows(self, rows, keep_position=True):
+        self.rows = list(rows)
+        if not keep_position:
+            self.top = 0
+        self.top = self._clamp(self.top)
+        self._sync()
+
+    def _clamp(self, top):
+        return max(0, min(top, len(self.rows) - self.visible_rows))
+
+    def _sync(self):
+        lo = max(0, self.top - self.buffer_rows)
+        hi = min(len(self.rows), self.top + self.visible_rows + self.buffer_rows)
+        self._apply(self.rows[lo:hi])
+        self._window = (lo, hi)
+        if hi > lo:
+            self.tree.yview_moveto((self.top - lo) / (hi - lo))
+        self._update_scrollbar()
+
+    def _apply(self, window):
+        wanted = dict(window)
+        stale = [iid for iid in self._shown if iid not in wanted]
+        if stale:
+            self.tree.delete(*stale)
+        # Ids still shown, in widget order; matching ones are left where they are
+        current = [iid for iid in self._shown if iid in wanted]
+        j = 0
+        for i, (iid, values) in enumerate(window):
+            if j < len(current) and current[j] == iid:
+                j += 1
+            elif iid in self._shown:
+                self.tree.move(iid, '', i)
+                current.remove(iid)
+            else:
+                self.tree.insert('', i, iid=iid, values=values)
+                continue
+            if self._shown[iid] != values:
+                self.tree.item(iid, values=values)
+        self._shown = wanted
+
+    def _near_edge(self, top):
+        lo, hi = self._window
+        margin = self.buffer_rows // 2
+        return (lo > 0 and top - lo < margin) or (hi < len(self.rows) and hi - (top + self.visible_rows) < margin)
+
+    def scroll_to(self, top):
+        top = self._clamp(top)
+        if top == self.top:
+            return
+        self.top = top
+        lo, hi = self._window
+        if lo <= top and top + self.visible_rows <= hi and not self._near_edge(top):
+            self.tree.yview_moveto((top - lo) / (hi - lo))
+            self._update_scrollbar()
+        else:
+            self._sync()
+
+    def yview(self, *args):
+        # Scrollbar command: ("moveto", fraction) or ("scroll", count, "units" | "pages")
+        if args[0] == "moveto":
+            self.scroll_to(int(round(float(args[1]) * len(self.rows))))
+        elif args[0] == "scroll":
+            step = self.visible_rows if args[2] == "pages" else 1
+            self.scroll_to(self.top + int(args[1]) * step)
+
+    def on_tree_scroll(self, first, last):
+        # yscrollcommand of the tree: the mouse wheel and keyboard scroll inside the window
+        lo, hi = self._window
+        top = self._clamp(lo + int(round(float(first) * (hi - lo))))
+        if top == self.top:
+            return
+        self.top = top
+        if self._near_edge(top):
+            self._sync()
+        else:
+            self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        if self.scrollbar is not None:
+            total = len(self.rows) or 1
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + self.visible_rows) / total))
@@ -0,0 +1,185 @@
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+
+from metrics import METRICS
+
+
+def normalize_text(text):
+    # The default sentiment model is uncased, so case and spacing never change the result
+    return " ".join(text.lower().split())
+
+
+class LRUCache:
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key, value):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class SentimentService:
+    # Queues texts and scores them in micro-batches on a single worker thread.
+    # A batch is sent as soon as it holds max_batch_size texts or the oldest
+    # pending text has waited max_latency seconds.
+
+    _STOP = object()
+
+    def __init__(self, get_analyzer, max_batch_size=16, max_latency=0.02, cache_size=1024, latency_window=1000):
+        self.get_analyzer = get_analyzer  # Called on the worker thread, so a lazy model loads off the UI thread
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.cache = LRUCache(cache_size)
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=latency_window)
+        self._counters = {"requests": 0, "cache_hits": 0, "coalesced": 0, "batches": 0, "inferred": 0, "errors": 0}
+        self._inflight = {}  # Normalized text -> future of a queued request, so duplicates share one inference
+        self._inference_seconds = 0.0
+        self._worker = None
+
+    def start(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="sentiment-service", daemon=True)
+                self._worker.start()
+
+    def close(self, timeout=None):
+        if self._worker is not None:
+            self._queue.put(self._STOP)
+            self._worker.join(timeout)
+            self._worker = None
+
+    def submit(self, text):
+        key = normalize_text(text)
+        cached = self.cache.get(key)
+        with self._lock:
+            self._counters["requests"] += 1
+            if cached is not None:
+                self._counters["cache_hits"] += 1
+                self._latencies.append(0.0)
+            elif key in self._inflight:
+                self._counters["coalesced"] += 1
+                return self._inflight[key]
+        future = Future()
+        if cached is not None:
+            future.set_result(cached)
+            return future
+        with self._lock:
+            self._inflight[key] = future
+        self.start()
+        self._queue.put((key, text, future, time.perf_counter()))
+        return future
+
+    def submit_many(self, texts):
+        return [self.submit(text) for text in texts]
+
+    def score(self, text, timeout=None):
+        return self.submit(text).result(timeout)
+
+    def score_many(self, texts, timeout=None):
+        # Re-score a backlog such as old journal entries; batches form naturally as the queue fills
+        return [future.result(timeout) for future in self.submit_many(texts)]
+
+    def _collect_batch(self, first):
+        batch = [first]
+        deadline = first[3] + self.max_latency
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is self._STOP:
+                self._queue.put(item)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is self._STOP:
+                return
+            self._process(self._collect_batch(first))
+
+    def _process(self, batch):
+        pending = OrderedDict()
+        for key, text, future, submitted in batch:
+            pending.setdefault(key, (text, []))[1].append((future, submitted))
+
+        texts = [text for text, waiters in pending.values()]
+        start = time.perf_counter()
+        try:
+            results = list(self.get_analyzer()(texts))
+        except Exception as exc:
+            with self._lock:
+                self._counters["errors"] += len(batch)
+                for key in pending:
+                    self._inflight.pop(key, None)
+            for text, waiters in pending.values():
+                for future, submitted in waiters:
+                    future.set_exception(exc)
+            return
+        finished = time.perf_counter()
+        METRICS.observe("sentiment_inference", finished - start)
+        METRICS.increment("sentiment_texts", len(texts))
+
+        with self._lock:
+            self._counters["batches"] += 1
+            self._counters["inferred"] += len(texts)
+            self._inference_seconds += finished - start
+            for text, waiters in pending.values():
+                for future, submitted in waiters:
+                    self._latencies.append(finished - submitted)
+
+        for (key, (text, waiters)), result in zip(pending.items(), results):
+            self.cache.put(key, result)
+            with self._lock:
+                self._inflight.pop(key, None)
+            for future, submitted in waiters:
+                future.set_result(result)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            latencies = sorted(self._latencies)
+            inference_seconds = self._inference_seconds
+        stats["cache_size"] = len(self.cache)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["mean_batch_size"] = stats["inferred"] / stats["batches"] if stats["batches"] else 0.0
+        stats["throughput_per_s"] = stats["inferred"] / inference_seconds if inference_seconds else 0.0
+        stats["p50_latency_ms"] = _percentile(latencies, 50) * 1000
+        stats["p95_latency_ms"] = _percentile(latencies, 95) * 1000
+        return stats
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
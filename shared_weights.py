@@ -0,0 +1,190 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import warnings
+
+# Model weights shared between processes. A pipeline is exported once to a directory
+# holding model.safetensors, its config and tokenizer; every process then maps that
+# file read-only and builds its tensors directly on the mapping, so the weights sit
+# in the page cache once no matter how many workers use them.
+#
+#   python shared_weights.py export sentiment-analysis models/sentiment
+#   python shared_weights.py report models/sentiment --workers 4
+#   python shared_weights.py report models/sentiment --workers 4 --copies   # for comparison
+
+WEIGHTS_FILE = "model.safetensors"
+PIPELINE_FILE = "pipeline.json"
+REPORT_TIMEOUT = 600  # Seconds a report worker may take to load its model
+
+# Pipeline task -> transformers auto class for its model
+MODEL_CLASSES = {
+    "sentiment-analysis": "AutoModelForSequenceClassification",
+    "text-classification": "AutoModelForSequenceClassification",
+    "fill-mask": "AutoModelForMaskedLM",
+}
+
+# safetensors dtype -> torch dtype name
+_DTYPES = {
+    "F64": "float64", "F32": "float32", "F16": "float16", "BF16": "bfloat16",
+    "I64": "int64", "I32": "int32", "I16": "int16", "I8": "int8", "U8": "uint8", "BOOL": "bool",
+}
+
+
+def export_pipeline(task, directory, model=None):
+    # Load a pipeline the normal way once and write what load_mapped_pipeline needs
+    from model_registry import load_pipeline
+
+    pipe = load_pipeline(task, model)
+    os.makedirs(directory, exist_ok=True)
+    # One file, so every tensor comes from the same mapping
+    pipe.model.save_pretrained(directory, safe_serialization=True, max_shard_size="1000GB")
+    pipe.tokenizer.save_pretrained(directory)
+    with open(os.path.join(directory, PIPELINE_FILE), "w") as f:
+        json.dump({"task": task, "model": model}, f)
+    return directory
+
+
+class MappedWeights:
+    # Read-only view of a safetensors file; tensors alias the mapped pages instead of copying them
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        header_size = struct.unpack("<Q", self._map[:8])[0]
+        self.header = json.loads(self._map[8:8 + header_size])
+        self.metadata = self.header.pop("__metadata__", {})
+        self._data_start = 8 + header_size
+
+    def __len__(self):
+        return len(self.header)
+
+    def tensors(self):
+        import torch
+
+        view = memoryview(self._map)
+        with warnings.catch_warnings():
+            # The mapping is read-only on purpose; inference never writes to weights
+            warnings.filterwarnings("ignore", message="The given buffer is not writable")
+            for name, info in self.header.items():
+                dtype = getattr(torch, _DTYPES[info["dtype"]])
+                start, end = info["data_offsets"]
+                if start == end:
+                    yield name, torch.empty(info["shape"], dtype=dtype)
+                    continue
+                data = view[self._data_start + start:self._data_start + end]
+                yield name, torch.frombuffer(data, dtype=dtype).reshape(info["shape"])
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+def load_mapped_pipeline(directory, task=None):
+    import transformers
+    from transformers import AutoConfig, AutoTokenizer, pipeline
+
+    if task is None:
+        with open(os.path.join(directory, PIPELINE_FILE)) as f:
+            task = json.load(f)["task"]
+    config = AutoConfig.from_pretrained(directory)
+    model = getattr(transformers, MODEL_CLASSES[task]).from_config(config)
+    weights = MappedWeights(os.path.join(directory, WEIGHTS_FILE))
+    # assign=True swaps the freshly initialized parameters for the mapped tensors rather than copying into them
+    state = dict(weights.tensors())
+    missing, unexpected = model.load_state_dict(state, strict=False, assign=True)
+    model.tie_weights()  # Tied output embeddings are not stored separately
+    mapped = {tensor.data_ptr() for tensor in state.values()}
+    params = dict(model.named_parameters(remove_duplicate=False))
+    untied = sorted(name for name in missing if name in params and params[name].data_ptr() not in mapped)
+    if untied or unexpected:
+        print(f"Warning: {directory} did not match the model: missing {untied}, unexpected {sorted(unexpected)}")
+    model.eval()
+    model.mapped_weights = weights  # The mapping must live as long as the model
+    return pipeline(task, model=model, tokenizer=AutoTokenizer.from_pretrained(directory))
+
+
+def memory_usage(pid="self"):
+    # Resident memory in KiB from /proc (Linux only). RssFile counts mapped weights; Pss splits
+    # shared pages between the processes using them, so it is what adds up across workers.
+    usage = {}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "RssAnon", "RssFile"):
+                    usage[key] = int(value.split()[0])
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key == "Pss":
+                    usage[key] = int(value.split()[0])
+    except OSError:
+        pass
+    return usage
+
+
+def _report_worker(index, directory, copies, loaded, measured, results):
+    before = memory_usage()
+    if copies:
+        from model_registry import load_pipeline
+        with open(os.path.join(directory, PIPELINE_FILE)) as f:
+            pipe = load_pipeline(json.load(f)["task"], directory)
+    else:
+        pipe = load_mapped_pipeline(directory)
+    pipe("Warming up the model")
+    loaded.wait(REPORT_TIMEOUT)  # Measure while every worker holds its model, so shared pages are split between all of them
+    results.put((index, os.getpid(), before, memory_usage()))
+    measured.wait(REPORT_TIMEOUT)
+
+
+def rss_report(directory, workers=4, copies=False):
+    # Start workers that each load the exported pipeline; returns [(index, pid, before, after)] memory usage
+    import multiprocessing
+
+    context = multiprocessing.get_context("spawn")
+    loaded, measured = context.Barrier(workers), context.Barrier(workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=_report_worker, args=(i, directory, copies, loaded, measured, results))
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    report = sorted(results.get(timeout=REPORT_TIMEOUT) for _ in processes)
+    for process in processes:
+        process.join()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export pipelines for shared, memory-mapped loading.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="write a pipeline's weights, config and tokenizer")
+    export.add_argument("task", choices=sorted(MODEL_CLASSES))
+    export.add_argument("directory")
+    export.add_argument("--model", help="model name (default: the pipeline's default)")
+    report = commands.add_parser("report", help="memory per worker before and after loading")
+    report.add_argument("directory")
+    report.add_argument("--workers", type=int, default=4)
+    report.add_argument("--copies", action="store_true", help="load private copies instead of mapping")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        export_pipeline(args.task, args.directory, args.model)
+        print(f"Exported {args.task} to {args.directory}")
+        return 0
+
+    rows = rss_report(args.directory, args.workers, args.copies)
+    print(f"{'worker':>6} {'pid':>8} {'RSS before':>12} {'RSS after':>12} {'file-backed':>12} {'PSS after':>12}  (KiB)")
+    for index, pid, before, after in rows:
+        print(f"{index:>6} {pid:>8} {before.get('VmRSS', 0):>12} {after.get('VmRSS', 0):>12} {after.get('RssFile', 0):>12} {after.get('Pss', 0):>12}")
+    print(f"Total PSS after loading: {sum(after.get('Pss', 0) for _, _, _, after in rows)} KiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
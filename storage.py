@@ -0,0 +1,402 @@
+import datetime
+import json
+import os
+import pickle
+import queue
+import sqlite3
+import threading
+import time
+
+from metrics import METRICS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS preferences (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    name TEXT PRIMARY KEY,
+    added_at TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS goals (
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    deadline TEXT NOT NULL,
+    added_at TEXT NOT NULL,
+    PRIMARY KEY (kind, name)
+);
+CREATE INDEX IF NOT EXISTS goals_by_deadline ON goals (deadline);
+CREATE TABLE IF NOT EXISTS schedule_slots (
+    day TEXT NOT NULL,
+    start_minute INTEGER NOT NULL,
+    end_minute INTEGER NOT NULL,
+    task TEXT NOT NULL,
+    PRIMARY KEY (day, start_minute)
+);
+CREATE TABLE IF NOT EXISTS task_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    recorded_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS task_history_by_time ON task_history (recorded_at);
+CREATE TABLE IF NOT EXISTS achievements (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    achieved_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS achievements_by_time ON achievements (achieved_at);
+CREATE TABLE IF NOT EXISTS busy_blocks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    day TEXT NOT NULL,
+    start_minute INTEGER NOT NULL,
+    end_minute INTEGER NOT NULL,
+    task TEXT NOT NULL,
+    source TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS busy_blocks_by_day ON busy_blocks (day, start_minute);
+CREATE INDEX IF NOT EXISTS busy_blocks_by_source ON busy_blocks (source);
+CREATE TABLE IF NOT EXISTS archived_goals (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    deadline TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    completed TEXT NOT NULL,
+    dropped TEXT NOT NULL,
+    archived_at TEXT NOT NULL
+);
+"""
+
+GOAL_KINDS = ("target", "yearly", "complex")
+FLUSH_TIMEOUT = 30.0  # Seconds flush() waits for the writer by default
+
+
+def _now():
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")  # Durable at checkpoints, no fsync per commit in WAL mode
+    return conn
+
+
+class _Flush:
+    # Queue marker: set once every write queued before it was applied, with the errors they raised
+    def __init__(self):
+        self.event = threading.Event()
+        self.errors = []
+
+
+class Store:
+    # Writes are queued and applied by one writer thread, which commits
+    # everything pending in a single transaction, so callers never block on disk.
+    # Each write runs under its own savepoint, so a failing one is rolled back alone.
+    # Reads use their own connection; WAL lets them run alongside the writer.
+
+    def __init__(self, path="daily_life_manager.db"):
+        self.path = path
+        self._queue = queue.Queue()
+        self._closed = False
+        self._read_lock = threading.Lock()
+        self._reader = _connect(path)
+        self._reader.executescript(SCHEMA)
+        self._migrate()
+        self._writer = threading.Thread(target=self._write_loop, name="store-writer", daemon=True)
+        self._writer.start()
+
+    def _migrate(self):
+        # Columns added after a table was first created
+        columns = {row[1] for row in self._reader.execute("PRAGMA table_info(tasks)")}
+        if "count" not in columns:
+            self._reader.execute("ALTER TABLE tasks ADD COLUMN count INTEGER NOT NULL DEFAULT 1")
+
+    # Writing
+
+    def _enqueue(self, sql, params=()):
+        if self._closed:
+            raise RuntimeError(f"Store {self.path} is closed")
+        self._queue.put((sql, params))
+
+    def _apply(self, conn, sql, params):
+        conn.execute("SAVEPOINT op")
+        try:
+            if isinstance(params, list):
+                conn.executemany(sql, params)
+            else:
+                conn.execute(sql, params)
+        except Exception:
+            conn.execute("ROLLBACK TO op")
+            raise
+        finally:
+            conn.execute("RELEASE op")
+
+    def _write_loop(self):
+        conn = _connect(self.path)
+        errors = []  # Raised since the last flush marker, handed to it
+        while True:
+            ops = [self._queue.get()]
+            while True:
+                try:
+                    ops.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = False
+            done = []
+            written = 0
+            unflushed = 0  # Writes after the last flush marker in this batch
+            started = time.perf_counter()
+            try:
+                conn.execute("BEGIN")
+                for op in ops:
+                    if op is None:
+                        stop = True
+                    elif isinstance(op, _Flush):
+                        op.errors, errors = errors, []
+                        done.append(op)
+                        unflushed = 0
+                    else:
+                        unflushed += 1
+                        try:
+                            self._apply(conn, *op)
+                            written += 1
+                        except Exception as exc:
+                            print(f"Failed to save a change: {exc}")
+                            errors.append(exc)
+                            METRICS.increment("store_write_errors")
+                conn.execute("COMMIT")
+                METRICS.observe("store_commit", time.perf_counter() - started)
+                METRICS.increment("store_writes", written)
+            except Exception as exc:
+                # The transaction itself failed (e.g. the disk is full); nothing in it was saved
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                print(f"Failed to save {written} changes: {exc}")
+                for marker in done:
+                    marker.errors.append(exc)
+                if unflushed:
+                    errors.append(exc)
+                METRICS.increment("store_write_errors")
+            finally:
+                for marker in done:
+                    marker.event.set()
+            if stop:
+                conn.close()
+                return
+
+    def flush(self, timeout=FLUSH_TIMEOUT):
+        # Block until every write queued so far is committed. Returns False if that takes longer
+        # than timeout seconds; raises the first error those writes hit.
+        if self._closed:
+            raise RuntimeError(f"Store {self.path} is closed")
+        marker = _Flush()
+        self._queue.put(marker)
+        if not marker.event.wait(timeout):
+            return False
+        if marker.errors:
+            raise marker.errors[0]
+        return True
+
+    def close(self):
+        self._closed = True
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        with self._read_lock:
+            self._reader.close()
+
+    def set_meta(self, key, value):
+        self._enqueue("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def set_preferences(self, preferences):
+        self._enqueue(
+            "INSERT INTO preferences (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            [(key, json.dumps(value)) for key, value in preferences.items()]
+        )
+
+    def add_task(self, name):
+        # Adding a task again, or a task merged into it, makes it come up more often
+        self._enqueue(
+            "INSERT INTO tasks (name, added_at) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET count = count + 1",
+            (name, _now())
+        )
+
+    def save_goal(self, kind, name, deadline):
+        if kind not in GOAL_KINDS:
+            raise ValueError(f"Unknown goal kind '{kind}'")
+        self._enqueue(
+            "INSERT INTO goals (kind, name, deadline, added_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(kind, name) DO UPDATE SET deadline = excluded.deadline",
+            (kind, name, deadline, _now())
+        )
+
+    def delete_goal(self, kind, name):
+        self._enqueue("DELETE FROM goals WHERE kind = ? AND name = ?", (kind, name))
+
+    def archive_goals(self, records):
+        # Move expired or completed goals (schedule_engine.ArchivedGoal) out of the live goals table
+        if not records:
+            return
+        now = _now()
+        self._enqueue(
+            "INSERT INTO archived_goals (kind, name, deadline, reason, completed, dropped, archived_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(r.kind, r.name, r.deadline, r.reason, json.dumps(r.completed), json.dumps(r.dropped), now) for r in records]
+        )
+        self._enqueue("DELETE FROM goals WHERE kind = ? AND name = ?", [(r.kind, r.name) for r in records])
+
+    def save_schedule(self, day, slots):
+        # Replace the stored slots for one day
+        day = day.isoformat()
+        self._enqueue("DELETE FROM schedule_slots WHERE day = ?", (day,))
+        self._enqueue(
+            "INSERT INTO schedule_slots (day, start_minute, end_minute, task) VALUES (?, ?, ?, ?)",
+            [(day, slot.start, slot.end, slot.task) for slot in slots]
+        )
+
+    def import_busy(self, blocks, source, chunk_size=1000):
+        # Replace the busy blocks imported from source with blocks, an iterable of
+        # (date, start_minute, end_minute, task). Only one chunk is held and queued at a time.
+        self._enqueue("DELETE FROM busy_blocks WHERE source = ?", (source,))
+        count = 0
+        chunk = []
+        for day, start, end, task in blocks:
+            chunk.append((day.isoformat(), start, end, task, source))
+            if len(chunk) >= chunk_size:
+                count += self._insert_busy(chunk)
+                chunk = []
+        count += self._insert_busy(chunk)
+        return count
+
+    def _insert_busy(self, rows):
+        self._enqueue("INSERT INTO busy_blocks (day, start_minute, end_minute, task, source) VALUES (?, ?, ?, ?, ?)", rows)
+        # Wait for the writer so a large import never piles up in the queue
+        if not self.flush():
+            raise TimeoutError(f"Saving busy blocks took over {FLUSH_TIMEOUT:g} seconds")
+        return len(rows)
+
+    def clear_busy(self, source=None):
+        if source is None:
+            self._enqueue("DELETE FROM busy_blocks")
+        else:
+            self._enqueue("DELETE FROM busy_blocks WHERE source = ?", (source,))
+
+    def record_task(self, task, outcome="completed", when=None):
+        when = (when or datetime.datetime.now()).isoformat(timespec="seconds")
+        self._enqueue("INSERT INTO task_history (task, outcome, recorded_at) VALUES (?, ?, ?)", (task, outcome, when))
+
+    def add_achievement(self, name, when=None):
+        when = (when or datetime.datetime.now()).isoformat(timespec="seconds")
+        self._enqueue("INSERT INTO achievements (name, achieved_at) VALUES (?, ?)", (name, when))
+
+    # Reading
+
+    def _query(self, sql, params=()):
+        with self._read_lock:
+            return self._reader.execute(sql, params).fetchall()
+
+    def get_meta(self, key, default=None):
+        rows = self._query("SELECT value FROM meta WHERE key = ?", (key,))
+        return json.loads(rows[0][0]) if rows else default
+
+    def load_preferences(self):
+        return {key: json.loads(value) for key, value in self._query("SELECT key, value FROM preferences")}
+
+    def load_tasks(self):
+        # [(name, times added)]
+        return self._query("SELECT name, count FROM tasks ORDER BY added_at")
+
+    def load_goals(self, kind=None):
+        # {kind: {name: deadline}} ordered by deadline
+        goals = {k: {} for k in GOAL_KINDS}
+        if kind is None:
+            rows = self._query("SELECT kind, name, deadline FROM goals ORDER BY deadline")
+        else:
+            rows = self._query("SELECT kind, name, deadline FROM goals WHERE kind = ? ORDER BY deadline", (kind,))
+        for row_kind, name, deadline in rows:
+            goals[row_kind][name] = deadline
+        return goals
+
+    def load_archived_goals(self, limit=100):
+        # Most recently archived first: (kind, name, deadline, reason, completed, dropped, archived_at)
+        rows = self._query(
+            "SELECT kind, name, deadline, reason, completed, dropped, archived_at FROM archived_goals "
+            "ORDER BY id DESC LIMIT ?", (limit,)
+        )
+        return [(kind, name, deadline, reason, json.loads(completed), json.loads(dropped), archived_at)
+                for kind, name, deadline, reason, completed, dropped, archived_at in rows]
+
+    def goals_due_between(self, start, end):
+        return self._query(
+            "SELECT kind, name, deadline FROM goals WHERE deadline >= ? AND deadline < ? ORDER BY deadline",
+            (start.isoformat(), end.isoformat())
+        )
+
+    def busy_between(self, start, end):
+        # [(date, start_minute, end_minute, task)] of imported busy blocks on days in [start, end)
+        rows = self._query(
+            "SELECT day, start_minute, end_minute, task FROM busy_blocks WHERE day >= ? AND day < ? "
+            "ORDER BY day, start_minute", (start.isoformat(), end.isoformat())
+        )
+        return [(datetime.date.fromisoformat(day), start_minute, end_minute, task) for day, start_minute, end_minute, task in rows]
+
+    def busy_sources(self):
+        return self._query("SELECT source, COUNT(*) FROM busy_blocks GROUP BY source ORDER BY source")
+
+    def load_schedule(self, day):
+        return self._query(
+            "SELECT start_minute, end_minute, task FROM schedule_slots WHERE day = ? ORDER BY start_minute", (day.isoformat(),)
+        )
+
+    def history_between(self, start, end):
+        return self._query(
+            "SELECT task, outcome, recorded_at FROM task_history "
+            "WHERE recorded_at >= ? AND recorded_at < ? ORDER BY recorded_at",
+            (start.isoformat(), end.isoformat())
+        )
+
+    def recent_history(self, limit=1000):
+        rows = self._query(
+            "SELECT task, outcome, recorded_at FROM task_history ORDER BY recorded_at DESC, id DESC LIMIT ?", (limit,)
+        )
+        return rows[::-1]
+
+    def iter_history(self, batch_size=1000):
+        # Stream the whole history in order without loading it all at once
+        last_id = 0
+        while True:
+            rows = self._query(
+                "SELECT id, task, outcome, recorded_at FROM task_history WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, batch_size)
+            )
+            if not rows:
+                return
+            for row_id, task, outcome, recorded_at in rows:
+                yield task, outcome, recorded_at
+            last_id = rows[-1][0]
+
+    def load_achievements(self):
+        return self._query("SELECT name, achieved_at FROM achievements ORDER BY achieved_at")
+
+    # Migration
+
+    def import_pickle(self, path="user_preferences.pkl"):
+        # One-time import of the preferences pickle written by older versions
+        if self._query("SELECT 1 FROM meta WHERE key = 'pickle_imported'") or not os.path.exists(path):
+            return False
+        with open(path, "rb") as f:
+            preferences = pickle.load(f)
+        self.set_preferences(preferences)
+        self._enqueue("INSERT OR REPLACE INTO meta (key, value) VALUES ('pickle_imported', ?)", (_now(),))
+        self.flush()
+        return True
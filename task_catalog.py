@@ -0,0 +1,162 @@
+import random
+
+# Tasks that stay on the menu when stress is high
+CALM_TASKS = ("Short Break", "Long Break", "Meditation", "Relax")
+
+# Task categories each stress level may draw from
+STRESS_CATEGORIES = {
+    "low": ("calm", "general"),
+    "normal": ("calm", "general"),
+    "high": ("calm",),
+}
+
+
+class AliasTable:
+    # Vose's alias method: O(n) to build, O(1) per weighted sample
+
+    def __init__(self, items, weights):
+        n = len(items)
+        if n == 0:
+            raise IndexError("Cannot sample from an empty task pool")
+        total = float(sum(weights))
+        scaled = [w * n / total for w in weights]
+        self.items = list(items)
+        self.fallback = False  # Set when the pool had to fall back to every task
+        self.prob = [0.0] * n
+        self.alias = [0] * n
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in large + small:
+            # Leftovers are 1.0 up to rounding error
+            self.prob[i] = 1.0
+
+    def __len__(self):
+        return len(self.items)
+
+    def sample(self, rng=random):
+        i = int(rng.random() * len(self.items))
+        return self.items[i] if rng.random() < self.prob[i] else self.items[self.alias[i]]
+
+
+class TaskCatalog:
+    # Unique tasks with their multiplicity, grouped by category. Alias tables are
+    # cached per (stress level, personalized) and rebuilt only when the tasks or
+    # weights they depend on change.
+
+    def __init__(self, tasks=(), calm_tasks=CALM_TASKS, preferred_boost=3.0):
+        self.preferred_boost = preferred_boost  # Weight multiplier for the user's preferred tasks
+        self.preferred = frozenset()
+        self._calm = frozenset(calm_tasks)
+        self._counts = {}
+        self._by_category = {"calm": {}, "general": {}}  # Insertion-ordered so seeded sampling is reproducible
+        self._adjustments = {}
+        self._tables = {}
+        self.version = 0  # Bumped on every change that can alter sampling, for callers caching results
+        self.add_many(tasks)
+
+    def __len__(self):
+        return len(self._counts)
+
+    def __contains__(self, task):
+        return task in self._counts
+
+    def __iter__(self):
+        return iter(list(self._counts))
+
+    def tasks(self):
+        return list(self._counts)
+
+    def count(self, task):
+        return self._counts.get(task, 0)
+
+    def category(self, task):
+        return "calm" if task in self._calm else "general"
+
+    def _invalidate(self, category=None, personalized_only=False):
+        self.version += 1
+        for key in list(self._tables):
+            stress_level, personalized = key
+            if personalized_only and not personalized:
+                continue
+            table = self._tables[key]
+            if category is None or table.fallback or category in STRESS_CATEGORIES.get(stress_level, ()):
+                del self._tables[key]
+
+    def add(self, task, count=1):
+        category = self.category(task)
+        self._counts[task] = self._counts.get(task, 0) + count
+        self._by_category[category][task] = None
+        self._invalidate(category)
+
+    def add_many(self, tasks):
+        touched = set()
+        for task in tasks:
+            category = self.category(task)
+            self._counts[task] = self._counts.get(task, 0) + 1
+            self._by_category[category][task] = None
+            touched.add(category)
+        for category in touched:
+            self._invalidate(category)
+
+    def remove(self, task):
+        if self._counts.pop(task, None) is None:
+            return False
+        category = self.category(task)
+        self._by_category[category].pop(task, None)
+        self._adjustments.pop(task, None)
+        self._invalidate(category)
+        return True
+
+    def set_preferred(self, tasks):
+        preferred = frozenset(tasks)
+        if preferred != self.preferred:
+            self.preferred = preferred
+            self._invalidate(personalized_only=True)
+
+    def set_adjustment(self, task, factor):
+        # History-derived weight multiplier for one task; 1.0 means no adjustment
+        if self._adjustments.get(task, 1.0) != factor:
+            if factor == 1.0:
+                self._adjustments.pop(task, None)
+            else:
+                self._adjustments[task] = factor
+            self._invalidate(self.category(task), personalized_only=True)
+
+    def weight(self, task, personalized=False):
+        weight = float(self._counts[task])
+        if personalized:
+            if task in self.preferred:
+                weight *= self.preferred_boost
+            weight *= self._adjustments.get(task, 1.0)
+        return weight
+
+    def _build(self, stress_level, personalized):
+        categories = STRESS_CATEGORIES.get(stress_level, STRESS_CATEGORIES["normal"])
+        pool = [task for category in categories for task in self._by_category[category]]
+        fallback = not pool
+        if fallback:
+            # Nothing calm in the catalog; fall back to every task rather than failing
+            pool = list(self._counts)
+        weights = [self.weight(task, personalized) for task in pool]
+        if pool and not any(weights):
+            weights = [1.0] * len(pool)
+        table = AliasTable(pool, weights)
+        table.fallback = fallback
+        return table
+
+    def table(self, stress_level="normal", personalized=False):
+        key = (stress_level if personalized else "normal", personalized)
+        table = self._tables.get(key)
+        if table is None:
+            table = self._tables[key] = self._build(*key)
+        return table
+
+    def sample(self, rng=random, stress_level="normal", personalized=False):
+        return self.table(stress_level, personalized).sample(rng)
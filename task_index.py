@@ -0,0 +1,221 @@
+import array
+import math
+import zlib
+
+import numpy as np
+
+# Similarity index over task names, so "gym!" or "grocery shoping" can be recognised as an
+# existing task and "go to gym" can suggest "Gym". Names are vectors in a normalized float32 matrix (one row per task) and
+# cosine similarity is a dot product. By default a vector is signed feature hashing of
+# the name's character trigrams and words; an embedding function can replace it.
+#
+# Hashed vectors also keep an inverted index from each trigram and word to the rows
+# containing it. A query collects the rows sharing its rarest features, keeps the ones
+# sharing the most and only computes cosine similarity for those, so search stays
+# well under a millisecond at 100k tasks instead of scanning the whole matrix. The
+# result is approximate: a best match sharing none of the rarest features is missed.
+
+# Sentence punctuation around a name or word, as in "gym!" or "(reading)"
+_EDGE_PUNCTUATION = " .,;:!?'\"()"
+
+
+def normalize_task(text):
+    # Case, spacing and surrounding punctuation never make two tasks different;
+    # punctuation inside a name does, so "C#" stays apart from "C++"
+    return " ".join(text.lower().split()).strip(_EDGE_PUNCTUATION)
+
+
+def task_features(normalized):
+    padded = f" {normalized} "
+    grams = {padded[i:i + 3] for i in range(len(padded) - 2)}
+    grams.update("w:" + word.strip(_EDGE_PUNCTUATION) for word in normalized.split())
+    return grams
+
+
+def _hash(feature):
+    # Stable across runs and processes, unlike hash() on strings
+    return zlib.crc32(feature.encode("utf-8"))
+
+
+class TaskIndex:
+    def __init__(self, dim=256, embed=None, max_candidates=2048, shortlist=64, merge_similarity=0.8, suggest_similarity=0.45):
+        self.dim = dim
+        self.embed = embed  # texts -> (n, d) array; None uses hashed n-grams
+        self.merge_similarity = merge_similarity  # A new task this close to an existing one is taken to be it
+        self.suggest_similarity = suggest_similarity  # Weaker matches are only suggested
+        self.max_candidates = max_candidates  # Posting entries a hashed query reads at most
+        self.shortlist = shortlist  # Candidates whose cosine similarity is computed
+        self._tasks = []  # Row -> task, None once removed
+        self._rows = {}  # Task -> row
+        self._by_key = {}  # Normalized name -> row of the first live task with it
+        self._alive = np.zeros(0, dtype=bool)
+        self._matrix = np.zeros((0, dim), dtype=np.float32)
+        self._postings = {}  # Feature -> array of rows (hashed vectors only)
+        self._removed = 0
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, task):
+        return task in self._rows
+
+    def _hashed_vector(self, features):
+        hashes = [_hash(feature) for feature in features]
+        vector = np.bincount([h % self.dim for h in hashes], [1.0 if h & 0x80000000 else -1.0 for h in hashes], self.dim)
+        norm = math.sqrt(vector @ vector)
+        return (vector / norm if norm else vector).astype(np.float32)
+
+    def _embedded(self, names):
+        vectors = np.asarray(self.embed(names), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1.0)
+
+    def _reserve(self, count, width):
+        # Grow the matrix geometrically so adding tasks one by one stays amortized O(1)
+        needed = len(self._tasks) + count
+        if self._matrix.shape[1] != width:
+            self._matrix = np.zeros((0, width), dtype=np.float32)
+        if needed > len(self._matrix):
+            capacity = max(needed, 2 * len(self._matrix), 64)
+            matrix = np.zeros((capacity, width), dtype=np.float32)
+            matrix[:len(self._tasks)] = self._matrix[:len(self._tasks)]
+            alive = np.zeros(capacity, dtype=bool)
+            alive[:len(self._tasks)] = self._alive[:len(self._tasks)]
+            self._matrix, self._alive = matrix, alive
+
+    def add_many(self, tasks):
+        tasks = [task for task in dict.fromkeys(tasks) if task not in self._rows]
+        if not tasks:
+            return
+        keys = [normalize_task(task) for task in tasks]
+        if self.embed is None:
+            features = [task_features(key) for key in keys]
+            vectors = [self._hashed_vector(grams) for grams in features]
+            self._reserve(len(tasks), self.dim)
+        else:
+            vectors = self._embedded(tasks)
+            self._reserve(len(tasks), vectors.shape[1])
+        for i, task in enumerate(tasks):
+            row = len(self._tasks)
+            self._tasks.append(task)
+            self._rows[task] = row
+            self._matrix[row] = vectors[i]
+            self._alive[row] = True
+            self._by_key.setdefault(keys[i], row)
+            if self.embed is None:
+                for feature in features[i]:
+                    postings = self._postings.get(feature)
+                    if postings is None:
+                        postings = self._postings[feature] = array.array("i")
+                    postings.append(row)
+
+    def add(self, task):
+        self.add_many([task])
+
+    def remove(self, task):
+        row = self._rows.pop(task, None)
+        if row is None:
+            return False
+        self._tasks[row] = None
+        self._alive[row] = False
+        self._matrix[row] = 0.0
+        key = normalize_task(task)
+        if self._by_key.get(key) == row:
+            del self._by_key[key]
+            # Another live task may share the normalized name
+            for other in self._rows:
+                if normalize_task(other) == key:
+                    self._by_key[key] = self._rows[other]
+                    break
+        self._removed += 1
+        if self._removed > len(self._rows) + 64:
+            self.rebuild()
+        return True
+
+    def rebuild(self, embed=False):
+        # Drop removed rows; with embed=None given explicitly the index switches back to hashed vectors
+        tasks = [task for task in self._tasks if task is not None]
+        if embed is not False:
+            self.embed = embed
+        self._tasks, self._rows, self._by_key, self._postings = [], {}, {}, {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._matrix = np.zeros((0, self.dim), dtype=np.float32)
+        self._removed = 0
+        self.add_many(tasks)
+
+    def exact(self, text):
+        # The task whose normalized name equals text's, or None
+        row = self._by_key.get(normalize_task(text))
+        return self._tasks[row] if row is not None else None
+
+    def _candidates(self, features):
+        postings = sorted((self._postings[f] for f in features if f in self._postings), key=len)
+        chosen, total = [], 0
+        for rows in postings:
+            if chosen and total + len(rows) > self.max_candidates:
+                break
+            chosen.append(np.frombuffer(rows, dtype=np.int32))
+            total += len(rows)
+        if not chosen:
+            return np.zeros(0, dtype=np.int32)
+        rows, shared = np.unique(np.concatenate(chosen), return_counts=True)
+        live = self._alive[rows]
+        rows, shared = rows[live], shared[live]
+        if len(rows) > self.shortlist:
+            rows = rows[np.argpartition(-shared, self.shortlist - 1)[:self.shortlist]]
+        return rows
+
+    def search(self, text, k=5, min_similarity=0.0):
+        # [(task, similarity)] of the k most similar tasks, best first
+        if not self._rows:
+            return []
+        if self.embed is None:
+            features = task_features(normalize_task(text))
+            query = self._hashed_vector(features)
+        else:
+            query = self._embedded([text])[0]
+        if self.embed is None and len(self._tasks) > self.max_candidates:
+            rows = self._candidates(features)
+            if not len(rows):
+                return []
+            scores = self._matrix[rows] @ query
+        else:
+            # Small enough (or without postings) to score every row; removed rows are all zeros
+            rows = np.arange(len(self._tasks))
+            scores = self._matrix[:len(self._tasks)] @ query
+            if self._removed:
+                rows, scores = rows[self._alive[:len(self._tasks)]], scores[self._alive[:len(self._tasks)]]
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self._tasks[rows[i]], float(scores[i])) for i in top if scores[i] >= min_similarity]
+
+    def resolve(self, text, k=3):
+        # (existing task text should merge into or None, [similar tasks to suggest])
+        exact = self.exact(text)
+        if exact is not None:
+            return exact, []
+        matches = self.search(text, k, self.suggest_similarity)
+        if matches and matches[0][1] >= self.merge_similarity:
+            return matches[0][0], []
+        return None, [task for task, similarity in matches]
+
+
+def model_embedder(get_pipe, batch_size=64):
+    # Mean-pooled last hidden states of a transformers pipeline's model, e.g. the task_parser fill-mask
+    # model. get_pipe is called for every batch so the registry can still unload the model when idle.
+    import torch
+
+    def embed(texts):
+        pipe = get_pipe()
+        batches = []
+        with torch.no_grad():
+            for i in range(0, len(texts), batch_size):
+                tokens = pipe.tokenizer(list(texts[i:i + batch_size]), padding=True, truncation=True, return_tensors="pt")
+                hidden = pipe.model.base_model(**tokens).last_hidden_state
+                mask = tokens["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+                batches.append(((hidden * mask).sum(1) / mask.sum(1).clamp(min=1)).numpy())
+        return np.concatenate(batches) if batches else np.zeros((0, pipe.model.config.hidden_size), dtype=np.float32)
+    return embed